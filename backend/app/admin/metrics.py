@@ -1,2 +1,178 @@
-def api_latency_bucket() -> dict[str, float]:
-    return {"p50": 0.05, "p90": 0.15, "p99": 0.3}
+"""Rolling per-route latency histograms for the admin status payload.
+
+Durations land in fixed logarithmic buckets (four per doubling, 0.5 ms to
+~2 min, so any reported quantile is within ~9% of the true value). Each
+route keeps a ring of short time slots; a quantile over the last N seconds
+merges the slots that are still current. Memory is fixed per route and the
+number of routes is capped, so nothing grows with traffic.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from array import array
+from bisect import bisect_right
+from time import monotonic
+
+MIN_LATENCY = 0.0005
+BUCKETS_PER_DOUBLING = 4
+BUCKET_COUNT = 72
+SLOT_SECONDS = 10
+SLOT_COUNT = 30
+DEFAULT_WINDOW = 300
+MAX_ROUTES = 512
+UNMATCHED_ROUTE = "unmatched"
+OTHER_ROUTE = "other"
+
+# bucket 0 holds everything under MIN_LATENCY, the last one everything above the top bound
+_UPPER_BOUNDS = [MIN_LATENCY * 2 ** (index / BUCKETS_PER_DOUBLING) for index in range(BUCKET_COUNT)]
+
+
+def bucket_index(duration: float) -> int:
+    return bisect_right(_UPPER_BOUNDS, duration)
+
+
+def bucket_value(index: int) -> float:
+    """Representative latency for a bucket: the geometric midpoint of its bounds."""
+
+    if index == 0:
+        return MIN_LATENCY / 2
+    upper = _UPPER_BOUNDS[min(index, BUCKET_COUNT - 1)]
+    return upper / 2 ** (0.5 / BUCKETS_PER_DOUBLING)
+
+
+class RouteHistogram:
+    """Ring of per-slot bucket counts for one route."""
+
+    __slots__ = ("epochs", "slots")
+
+    def __init__(self) -> None:
+        self.epochs = [-1] * SLOT_COUNT
+        self.slots: list[array | None] = [None] * SLOT_COUNT
+
+    def record(self, epoch: int, index: int) -> None:
+        position = epoch % SLOT_COUNT
+        if self.epochs[position] != epoch:
+            # Swap in a fresh slot instead of zeroing in place so readers never see a half-reset one.
+            self.slots[position] = array("Q", bytes(8 * (BUCKET_COUNT + 1)))
+            self.epochs[position] = epoch
+        self.slots[position][index] += 1
+
+    def merge_into(self, counts: list[int], oldest_epoch: int) -> None:
+        for epoch, slot in zip(self.epochs, self.slots):
+            if slot is not None and epoch >= oldest_epoch:
+                for index, count in enumerate(slot):
+                    if count:
+                        counts[index] += count
+
+
+class LatencyHistograms:
+    """Per-route latency histograms keyed by ``"METHOD /route/{template}"``.
+
+    Recording happens on the event loop thread from the request middleware,
+    so the hot path is a dict lookup, a bisect and an array increment; the
+    lock is only taken when a route is seen for the first time.
+    """
+
+    def __init__(self, max_routes: int = MAX_ROUTES) -> None:
+        self.max_routes = max_routes
+        self.routes: dict[str, RouteHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, duration: float, now: float | None = None) -> None:
+        histogram = self.routes.get(route)
+        if histogram is None:
+            histogram = self._register(route)
+        epoch = int((now if now is not None else monotonic()) // SLOT_SECONDS)
+        histogram.record(epoch, bucket_index(duration))
+
+    def _register(self, route: str) -> RouteHistogram:
+        with self._lock:
+            histogram = self.routes.get(route)
+            if histogram is None:
+                if len(self.routes) >= self.max_routes:
+                    route = OTHER_ROUTE
+                    histogram = self.routes.get(route)
+                if histogram is None:
+                    histogram = RouteHistogram()
+                    self.routes[route] = histogram
+            return histogram
+
+    def summary(self, route: str | None = None, window: float = DEFAULT_WINDOW, now: float | None = None) -> dict:
+        """Request count and p50/p90/p99 (seconds) over the last ``window`` seconds.
+
+        ``route=None`` merges every route into one API-wide distribution.
+        """
+
+        oldest = self._oldest_epoch(window, now)
+        counts = [0] * (BUCKET_COUNT + 1)
+        histograms = list(self.routes.values()) if route is None else [self.routes.get(route)]
+        for histogram in histograms:
+            if histogram is not None:
+                histogram.merge_into(counts, oldest)
+        return _quantiles(counts)
+
+    def route_summaries(self, window: float = DEFAULT_WINDOW, now: float | None = None) -> dict[str, dict]:
+        oldest = self._oldest_epoch(window, now)
+        summaries: dict[str, dict] = {}
+        for route, histogram in list(self.routes.items()):
+            counts = [0] * (BUCKET_COUNT + 1)
+            histogram.merge_into(counts, oldest)
+            if any(counts):
+                summaries[route] = _quantiles(counts)
+        return dict(sorted(summaries.items()))
+
+    def _oldest_epoch(self, window: float, now: float | None) -> int:
+        epoch = int((now if now is not None else monotonic()) // SLOT_SECONDS)
+        slots = max(1, min(SLOT_COUNT, math.ceil(window / SLOT_SECONDS)))
+        return epoch - slots + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.routes = {}
+
+
+def _quantiles(counts: list[int]) -> dict[str, float | int]:
+    total = sum(counts)
+    summary: dict[str, float | int] = {"requests": total}
+    for label, quantile in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        if not total:
+            summary[label] = 0.0
+            continue
+        rank = max(1, math.ceil(quantile * total))
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                summary[label] = round(bucket_value(index), 4)
+                break
+    return summary
+
+
+latency_histograms = LatencyHistograms()
+
+
+def route_template(scope: dict) -> str:
+    """The matched route template for a finished request, never the raw path."""
+
+    return getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+def route_label(scope: dict) -> str:
+    template = route_template(scope)
+    return template if template == UNMATCHED_ROUTE else f"{scope['method']} {template}"
+
+
+def api_latency_bucket() -> dict[str, float | int]:
+    """API-wide latency quantiles over the last five minutes."""
+
+    return latency_histograms.summary()
+
+
+def api_latency_routes() -> dict[str, object]:
+    return {
+        "window_seconds": DEFAULT_WINDOW,
+        "last_minute": latency_histograms.summary(window=60),
+        "routes": latency_histograms.route_summaries(),
+    }
@@ -0,0 +1,195 @@
+"""On-demand request profiles: a stack sampler, SQL timing and file storage.
+
+Profiles are only collected for requests an admin explicitly flags (see
+``app.middleware.profiling``). SQL statements are attributed to the request
+through a context variable, which also reaches sync endpoints running in
+the threadpool; the sampler walks every busy thread, so stacks from other
+requests running at the same moment can show up in a profile.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MAX_STACKS = 200
+MAX_FUNCTIONS = 40
+MAX_STATEMENT_CHARS = 500
+# Threads whose innermost frame is in one of these modules are idle (waiting on a lock, queue or socket poll).
+_IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+
+current_profile: ContextVar["RequestProfile | None"] = ContextVar("current_profile", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Collects call stacks of busy threads every ``interval`` seconds on a daemon thread."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="phill-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+
+
+class RequestProfile:
+    """Sampled stacks and SQL timings for one request."""
+
+    def __init__(self, profile_id: str, interval: float) -> None:
+        self.id = profile_id
+        self.sampler = StackSampler(interval)
+        self.statements: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+        self._lock = threading.Lock()
+
+    def record_statement(self, statement: str, duration: float) -> None:
+        with self._lock:
+            entry = self.statements[statement[:MAX_STATEMENT_CHARS]]
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+
+    def report(self, **request_info) -> dict:
+        stacks = self.sampler.stacks
+        self_counts: Counter[str] = Counter()
+        total_counts: Counter[str] = Counter()
+        for stack, count in stacks.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+
+        statements = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "id": self.id,
+            **request_info,
+            "sample_interval_ms": round(self.sampler.interval * 1000, 3),
+            "samples": self.sampler.samples,
+            "functions": [
+                {"function": label, "self": self_counts[label], "total": total}
+                for label, total in total_counts.most_common(MAX_FUNCTIONS)
+            ],
+            # "frame;frame;frame count" lines, ready for flamegraph.pl or speedscope
+            "collapsed_stacks": [f"{';'.join(stack)} {count}" for stack, count in stacks.most_common(MAX_STACKS)],
+            "sql": {
+                "count": sum(int(entry[0]) for _, entry in statements),
+                "total_ms": round(sum(entry[1] for _, entry in statements) * 1000, 3),
+                "statements": [
+                    {
+                        "statement": statement,
+                        "count": int(count),
+                        "total_ms": round(total * 1000, 3),
+                        "max_ms": round(longest * 1000, 3),
+                    }
+                    for statement, (count, total, longest) in statements
+                ],
+            },
+        }
+
+
+_instrumented: set[int] = set()
+_instrument_lock = threading.Lock()
+
+
+def instrument_sql(engine: Engine) -> None:
+    """Time statements for the profiled request; added on first use so unprofiled apps pay nothing."""
+
+    with _instrument_lock:
+        if id(engine) in _instrumented:
+            return
+        _instrumented.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if current_profile.get() is not None:
+            conn.info.setdefault("phill_profile_started", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        profile = current_profile.get()
+        started = conn.info.get("phill_profile_started")
+        if profile is not None and started:
+            profile.record_statement(statement, perf_counter() - started.pop())
+
+
+class ProfileStore:
+    """Keeps the newest ``max_profiles`` profiles as JSON files shared by all workers on the host."""
+
+    def __init__(self, directory: str, max_profiles: int) -> None:
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def save(self, report: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / f"{report['id']}.json"
+        temporary = target.with_suffix(".tmp")
+        temporary.write_text(json.dumps(report))
+        os.replace(temporary, target)
+        for stale in self._files()[self.max_profiles :]:
+            stale.unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        summaries = []
+        for path in self._files():
+            try:
+                report = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            summaries.append(
+                {
+                    key: report.get(key)
+                    for key in ("id", "method", "path", "route", "status", "user_id", "started_at", "duration_ms")
+                }
+                | {"sql_count": report.get("sql", {}).get("count", 0)}
+            )
+        return summaries
+
+    def get(self, profile_id: str) -> dict | None:
+        if not profile_id.isalnum():
+            return None
+        try:
+            return json.loads((self.directory / f"{profile_id}.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _files(self) -> list[Path]:
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        return [path for _, path in sorted(files, reverse=True)]
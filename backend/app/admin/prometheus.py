@@ -0,0 +1,142 @@
+"""Prometheus metrics and the ``/metrics`` scrape endpoint.
+
+Counters and histograms are plain ``prometheus_client`` objects, so updating
+one from a hot path is a dict lookup plus an add. When the API runs with
+several worker processes, point ``PROMETHEUS_MULTIPROC_DIR`` at an empty,
+writable directory before the workers start: every process then writes its
+samples to memory-mapped files there and a scrape of any worker aggregates
+all of them.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response, status
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+SIZE_BUCKETS = (1_024, 8_192, 65_536, 262_144, 524_288, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+AI_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+HTTP_REQUESTS = Counter(
+    "phill_http_requests_total", "HTTP requests by route template and status code", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "phill_http_request_duration_seconds",
+    "HTTP request duration by route template and status class",
+    ["method", "route", "status_class"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "phill_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "phill_db_pool_overflow",
+    "Database connections opened beyond the pool size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+AI_CALLS = Counter("phill_ai_calls_total", "AI provider calls by model", ["model"])
+AI_ERRORS = Counter("phill_ai_errors_total", "Failed AI provider calls by model", ["model"])
+AI_TOKENS = Counter("phill_ai_tokens_total", "AI tokens used by model and kind", ["model", "kind"])
+AI_LATENCY = Histogram(
+    "phill_ai_call_duration_seconds", "AI provider call duration by model", ["model"], buckets=AI_BUCKETS
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "phill_rate_limit_rejections_total", "Requests rejected by rate limit policy", ["policy"]
+)
+EMAIL_SENDS = Counter("phill_email_sends_total", "Outgoing emails by outcome", ["outcome"])
+UPLOAD_SIZE = Histogram(
+    "phill_upload_size_bytes", "Uploaded file sizes by endpoint", ["endpoint"], buckets=SIZE_BUCKETS
+)
+UPLOAD_LATENCY = Histogram(
+    "phill_upload_duration_seconds", "Time to read and store an upload by endpoint", ["endpoint"]
+)
+EXTRACTION_SIZE = Histogram(
+    "phill_extracted_text_bytes", "Text extracted from uploaded documents by kind", ["kind"], buckets=SIZE_BUCKETS
+)
+EXTRACTION_LATENCY = Histogram("phill_extraction_duration_seconds", "Document text extraction time by kind", ["kind"])
+
+
+def record_request(method: str, route: str, status_code: int, duration: float) -> None:
+    HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+    HTTP_LATENCY.labels(method, route, f"{status_code // 100}xx").observe(duration)
+
+
+def record_ai_call(model: str, duration: float, usage: dict | None = None, failed: bool = False) -> None:
+    AI_CALLS.labels(model).inc()
+    AI_LATENCY.labels(model).observe(duration)
+    if failed:
+        AI_ERRORS.labels(model).inc()
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage and usage.get(kind):
+            AI_TOKENS.labels(model, kind.removesuffix("_tokens")).inc(usage[kind])
+
+
+def instrument_engine(engine: Engine, name: str = "sync") -> None:
+    """Track pool checkouts and overflow through SQLAlchemy pool events."""
+
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+
+    def _update(returning: int) -> None:
+        DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout() - returning)
+        DB_POOL_OVERFLOW.labels(name).set(max(0, pool.overflow()))
+
+    # checkin fires before the connection is back in the pool, so it still counts as checked out
+    event.listen(engine, "checkout", lambda *_args: _update(0))
+    event.listen(engine, "checkin", lambda *_args: _update(1))
+
+
+def _registry() -> CollectorRegistry:
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> Response:
+    token = get_settings().metrics_token
+    if token:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not secrets.compare_digest(supplied, token):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def _mark_process_dead() -> None:
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def install_metrics(app: FastAPI, engines: dict[str, Engine]) -> None:
+    if not get_settings().metrics_enabled:
+        return
+    for name, engine in engines.items():
+        instrument_engine(engine, name)
+    app.include_router(router, tags=["metrics"])
+    app.add_event_handler("shutdown", _mark_process_dead)
@@ -0,0 +1,92 @@
+"""Per-request SQL counts and timings, slow-statement logging and N+1 hints.
+
+Every statement on an instrumented engine is attributed to the current
+request through a context variable (which also reaches sync endpoints in
+the threadpool). The numbers go into the request log line and, for admins,
+a ``Server-Timing`` header; see ``app.middleware.query_stats``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.admin.profiling import MAX_STATEMENT_CHARS
+
+logger = logging.getLogger("phill.sql")
+
+current_query_stats: ContextVar["QueryStats | None"] = ContextVar("current_query_stats", default=None)
+
+
+class QueryStats:
+    """Statements run while handling one request; ``shapes`` is only kept when N+1 detection is on."""
+
+    def __init__(self, track_shapes: bool = False) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] | None = Counter() if track_shapes else None
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.seconds += duration
+        if self.shapes is not None:
+            # Parameters are bound separately, so a loop of ``session.get`` repeats the exact same text.
+            self.shapes[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        if not self.shapes or threshold <= 0:
+            return []
+        return [(statement, count) for statement, count in self.shapes.most_common() if count >= threshold]
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+
+def truncate_statement(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= MAX_STATEMENT_CHARS else statement[:MAX_STATEMENT_CHARS] + "..."
+
+
+def instrument_queries(engine: Engine, slow_seconds: float) -> None:
+    """Count and time statements for the current request and log those slower than ``slow_seconds``.
+
+    ``slow_seconds`` of 0 turns slow-statement logging off; statements run
+    outside a request (startup, the retention sweeper) are then not timed.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if slow_seconds > 0 or current_query_stats.get() is not None:
+            conn.info.setdefault("phill_query_started", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.get("phill_query_started")
+        if not started:
+            return
+        duration = perf_counter() - started.pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if 0 < slow_seconds <= duration:
+            logger.warning(
+                "Slow query %.1fms: %s",
+                duration * 1000,
+                truncate_statement(statement),
+                extra={"duration_ms": round(duration * 1000, 2)},
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context) -> None:
+        # A failed statement never reaches after_cursor_execute; drop its start time.
+        if context.connection is None or context.execution_context is None:
+            return
+        started = context.connection.info.get("phill_query_started")
+        if started:
+            started.pop()
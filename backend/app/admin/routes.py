@@ -11,6 +11,7 @@ from app.communication.email import send_plain_email, smtp_configured, smtp_stat
 from app.communication.templates import get_or_create_template, update_template
 from app.communication.models import EmailTemplate
 from app.db import get_session
+from app.middleware.profiling import profile_store
 from app.security.dependencies import require_role
 from app.users.permissions import ROLE_ADMIN, ROLE_FOUNDER, has_role
 from app.users.models import AccessRequest, PasswordResetRequest, User
@@ -19,7 +20,7 @@ router = APIRouter()
 
 
 @router.get("/status")
-def get_status(current_user=Depends(require_role(ROLE_ADMIN))) -> dict[str, str]:
+def get_status(current_user=Depends(require_role(ROLE_ADMIN))) -> dict[str, object]:
     return system_status()
 
 
@@ -212,3 +213,16 @@ async def send_welcome_email(
         raise HTTPException(status_code=502, detail=f"Failed to send email: {exc}") from exc
 
     return {"status": "sent", "email": target.email}
+
+
+@router.get("/profiles")
+def list_profiles(current_user=Depends(require_role(ROLE_ADMIN))) -> list[dict]:
+    return profile_store().list()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, current_user=Depends(require_role(ROLE_ADMIN))) -> dict:
+    profile = profile_store().get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
@@ -1,10 +1,12 @@
 from datetime import datetime, timezone
 
-from app.admin.metrics import api_latency_bucket
+from app.admin.metrics import api_latency_bucket, api_latency_routes
 from app.ai.engine import ai_configuration
 from app.communication.email import smtp_configured
 from app.config import get_settings
-from app.db import ping_database
+from app.db import ping_database, pool_status
+from app.replica import replica_status
+from app.startup import boot_timings
 
 
 def system_status() -> dict[str, object]:
@@ -21,9 +23,11 @@ def system_status() -> dict[str, object]:
         "status": "ok" if overall_ok else "degraded",
         "environment": settings.env,
         "version": settings.app_version,
-        "database": {"ok": db_ok, "detail": db_detail},
+        "database": {"ok": db_ok, "detail": db_detail, "pool": pool_status(), "replica": replica_status()},
         "email": {"ok": email_ok, "detail": email_detail},
         "ai": ai_status,
         "metrics": api_latency_bucket(),
+        "latency": api_latency_routes(),
+        "startup_seconds": boot_timings,
         "checked_at": datetime.now(timezone.utc).isoformat(),
     }
@@ -1,10 +1,29 @@
+from functools import lru_cache
+from time import monotonic
 from typing import Any
 
-from openai import APIConnectionError, APIStatusError, OpenAI, OpenAIError, RateLimitError
-
+from app.admin.prometheus import record_ai_call
 from app.config import get_settings
 
 
+@lru_cache(maxsize=4)
+def _client(api_key: str):
+    # openai pulls in httpx and several hundred pydantic models; pay for that on first use, not at boot.
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+
+def warm_up() -> None:
+    """Import the OpenAI client and build it when a key is configured, ahead of the first chat."""
+
+    settings = get_settings()
+    if settings.openai_api_key:
+        _client(settings.openai_api_key)
+    else:
+        import openai  # noqa: F401
+
+
 def ai_configuration() -> dict[str, Any]:
     settings = get_settings()
     configured = bool(settings.openai_api_key and settings.ai_model)
@@ -29,14 +48,20 @@ def run_completion(prompt: str, system: str | None = None) -> dict[str, Any]:
         messages.append({"role": "system", "content": system})
     messages.append({"role": "user", "content": prompt})
 
+    from openai import APIConnectionError, APIStatusError, OpenAIError, RateLimitError
+
+    start = monotonic()
     try:
-        client = OpenAI(api_key=settings.openai_api_key)
+        client = _client(settings.openai_api_key)
         response = client.chat.completions.create(
             model=settings.ai_model,
             messages=messages,
             max_tokens=256,
         )
     except (APIConnectionError, APIStatusError, RateLimitError, OpenAIError) as exc:  # pragma: no cover - network dependent
+        record_ai_call(settings.ai_model, monotonic() - start, failed=True)
         raise RuntimeError(str(exc)) from exc
 
-    return response.model_dump()
+    payload = response.model_dump()
+    record_ai_call(settings.ai_model, monotonic() - start, payload.get("usage"))
+    return payload
@@ -1,12 +1,15 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.ai.schemas import AiMemoryCreate
 from app.ai.tables import AiMemory
+from app.utils.persistence import insert_row_async, insert_rows_async
 
 
-def store_memory(data: AiMemoryCreate, session: Session) -> AiMemory:
-    memory = AiMemory(**data.model_dump(exclude_none=True))
-    session.add(memory)
-    session.commit()
-    session.refresh(memory)
-    return memory
+async def store_memory(data: AiMemoryCreate, session: AsyncSession) -> AiMemory:
+    return await insert_row_async(session, AiMemory(**data.model_dump(exclude_none=True)))
+
+
+async def store_memories(items: list[AiMemoryCreate], session: AsyncSession) -> list[AiMemory]:
+    """Store several memories with one multi-row insert and one commit."""
+
+    return await insert_rows_async(session, [AiMemory(**data.model_dump(exclude_none=True)) for data in items])
@@ -1,13 +1,16 @@
 import io
 from datetime import datetime, timezone
+from time import monotonic
 from typing import Any
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
-from pypdf import PdfReader
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
+from app.admin.prometheus import EXTRACTION_LATENCY, EXTRACTION_SIZE, UPLOAD_LATENCY, UPLOAD_SIZE
 from app.ai.engine import ai_configuration, run_completion
-from app.ai.memory import store_memory
+from app.ai.memory import store_memories, store_memory
 from app.ai.safeguards import SAFE_SYSTEM_PROMPT, apply_safeguards
 from app.ai.schemas import (
     AiMemoryCreate,
@@ -16,13 +19,15 @@ from app.ai.schemas import (
     DocumentPayload,
     DocumentScopeUpdate,
 )
-from app.db import get_session
-from app.security.dependencies import get_current_active_user
+from app.db import get_async_session
+from app.replica import get_async_read_session
+from app.security.dependencies import get_current_active_user_async
 from app.users.models import User
 from app.users.permissions import ROLE_FOUNDER, has_role
 from app.ai.tables import AiMemory
 from app.config import get_settings
-from app.companies.models import Company
+from app.companies.cache import company_names
+from app.utils.etag import collection_etag, conditional_response
 
 router = APIRouter()
 
@@ -56,13 +61,6 @@ def _resolve_company_id(requested: str | None, current_user: User) -> str:
     return _resolve_company_ids([requested] if requested else [], requested, current_user)[0]
 
 
-def _company_names(session: Session, company_ids: set[str]) -> dict[str, str]:
-    if not company_ids:
-        return {}
-    rows = session.exec(select(Company).where(Company.id.in_(company_ids))).all()
-    return {row.id: row.name for row in rows}
-
-
 @router.get("/status")
 def ai_status() -> dict[str, Any]:
     """Expose AI configuration readiness for the UI."""
@@ -73,10 +71,10 @@ def ai_status() -> dict[str, Any]:
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(
+async def chat(
     request: ChatRequest,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> ChatResponse:
     settings = get_settings()
     system_prompt = request.system or SAFE_SYSTEM_PROMPT
@@ -92,7 +90,7 @@ def chat(
             seen.add(doc_id)
             document_ids.append(doc_id)
 
-        documents = _load_documents(document_ids, current_user, session)
+        documents = await _load_documents(document_ids, current_user, session)
         document_sections = []
         for doc in documents:
             text = doc.get("text") or doc.get("excerpt") or ""
@@ -101,7 +99,7 @@ def chat(
         prompt = "Use the provided documents to answer.\n\n" + "\n\n".join(document_sections) + f"\n\nUser question: {request.prompt}"
 
     try:
-        raw_output = run_completion(prompt, system_prompt)
+        raw_output = await run_in_threadpool(run_completion, prompt, system_prompt)
     except RuntimeError as exc:  # pragma: no cover - network dependent
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
@@ -127,7 +125,7 @@ def chat(
                 "model": raw_output.get("model"),
             },
         )
-        store_memory(memory, session)
+        await store_memory(memory, session)
 
     return ChatResponse(reply=safe_output, model=raw_output.get("model"), id=raw_output.get("id"), usage=raw_output.get("usage"))
 
@@ -140,8 +138,8 @@ async def upload_documents(
     scopes: list[str] | None = Form(default=None, alias="scopes"),
     company_id: str | None = Form(default=None),
     company_ids: list[str] | None = Form(default=None, alias="company_ids"),
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> list[DocumentPayload]:
     target_companies = _resolve_company_ids(company_ids, company_id, current_user)
 
@@ -161,11 +159,11 @@ async def upload_documents(
             raise HTTPException(status_code=400, detail="Scope count does not match file count")
 
     default_scope = (scope or "company").strip().lower()
-    documents: list[DocumentPayload] = []
+    pending: list[AiMemoryCreate] = []
     settings = get_settings()
     max_size = int(settings.ai_document_max_bytes or 512_000)
     max_text = int(settings.ai_document_max_text or 20_000)
-    company_names = _company_names(session, set(target_companies))
+    names = await session.run_sync(company_names, set(target_companies))
 
     for idx, upload in enumerate(upload_batch):
         target_scope = resolved_scopes[idx] if resolved_scopes else default_scope
@@ -174,14 +172,21 @@ async def upload_documents(
         if target_scope == "global" and not has_role(current_user.role, ROLE_FOUNDER):
             raise HTTPException(status_code=403, detail="Only founders can upload global training files")
 
+        upload_start = monotonic()
         raw_bytes = await upload.read()
         if not raw_bytes:
             raise HTTPException(status_code=400, detail=f"{upload.filename or 'File'} is empty")
 
         if len(raw_bytes) > max_size:
             raise HTTPException(status_code=413, detail=f"{upload.filename or 'File'} is too large (max {max_size} bytes)")
-
-        text = _extract_text(upload.filename or "", upload.content_type or "", raw_bytes)
+        UPLOAD_SIZE.labels("ai_documents").observe(len(raw_bytes))
+
+        extract_start = monotonic()
+        # PDF parsing is CPU-bound; keep it off the event loop.
+        text = await run_in_threadpool(_extract_text, upload.filename or "", upload.content_type or "", raw_bytes)
+        kind = _extraction_kind(upload.filename or "", upload.content_type or "", text)
+        EXTRACTION_LATENCY.labels(kind).observe(monotonic() - extract_start)
+        EXTRACTION_SIZE.labels(kind).observe(len(text.encode("utf-8")))
         trimmed_text = (text or "").strip()[:max_text]
         excerpt = trimmed_text[:300]
 
@@ -198,29 +203,36 @@ async def upload_documents(
                     "excerpt": excerpt,
                 },
             )
-            record = _store_memory(memory, session)
-            documents.append(_document_payload(record, company_names))
+            pending.append(memory)
+        UPLOAD_LATENCY.labels("ai_documents").observe(monotonic() - upload_start)
 
-    return documents
+    # One multi-row insert for every file and company; nothing is stored if any file is rejected.
+    records = await store_memories(pending, session)
+    return [_document_payload(record, names) for record in records]
 
 
 @router.get("/documents", response_model=list[DocumentPayload])
-def list_documents(
+async def list_documents(
+    request: Request,
+    response: Response,
     company_id: str | None = Query(default=None),
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> list[DocumentPayload]:
     if not current_user.company_id and not has_role(current_user.role, ROLE_FOUNDER):
         raise HTTPException(status_code=400, detail="User is not linked to a company")
 
     target_company = company_id if has_role(current_user.role, ROLE_FOUNDER) else current_user.company_id
-    records = session.exec(select(AiMemory).order_by(AiMemory.created_at.desc())).all()
+    # Global-scope documents from any company show up here, so use the cross-tenant version.
+    etag = await session.run_sync(collection_etag, "ai_documents", None, current_user.role, target_company)
+    if (not_modified := conditional_response(request, response, etag)) is not None:
+        return not_modified
+    query = select(AiMemory).where(AiMemory.data["type"].as_string() == "document")
+    records = (await session.exec(query.order_by(AiMemory.created_at.desc()))).all()
 
     visible: list[AiMemory] = []
     for record in records:
         data: dict[str, Any] = record.data or {}
-        if data.get("type") != "document":
-            continue
         scope = data.get("scope") or "company"
 
         if has_role(current_user.role, ROLE_FOUNDER):
@@ -231,17 +243,17 @@ def list_documents(
 
         visible.append(record)
 
-    company_names = _company_names(session, {record.company_id for record in visible})
-    return [_document_payload(record, company_names) for record in visible]
+    names = await session.run_sync(company_names, {record.company_id for record in visible})
+    return [_document_payload(record, names) for record in visible]
 
 
 @router.delete("/documents/{document_id}", status_code=204)
-def delete_document(
+async def delete_document(
     document_id: str,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> None:
-    record = session.get(AiMemory, document_id)
+    record = await session.get(AiMemory, document_id)
     if not record:
         raise HTTPException(status_code=404, detail="Document not found")
     if record.company_id != current_user.company_id and not has_role(current_user.role, ROLE_FOUNDER):
@@ -251,18 +263,18 @@ def delete_document(
     if data.get("type") != "document":
         raise HTTPException(status_code=404, detail="Document not found")
 
-    session.delete(record)
-    session.commit()
+    await session.delete(record)
+    await session.commit()
 
 
 @router.patch("/documents/{document_id}", response_model=DocumentPayload)
-def update_document_scope(
+async def update_document_scope(
     document_id: str,
     payload: DocumentScopeUpdate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> DocumentPayload:
-    record = session.get(AiMemory, document_id)
+    record = await session.get(AiMemory, document_id)
     if not record:
         raise HTTPException(status_code=404, detail="Document not found")
     if record.company_id != current_user.company_id and not has_role(current_user.role, ROLE_FOUNDER):
@@ -278,22 +290,14 @@ def update_document_scope(
     if scope == "global" and not has_role(current_user.role, ROLE_FOUNDER):
         raise HTTPException(status_code=403, detail="Only founders can manage global training scope")
 
-    data["scope"] = scope
-    record.data = data
+    # Assign a new dict: in-place changes to a JSON column are not tracked, so they would never be flushed.
+    record.data = {**data, "scope": scope}
     session.add(record)
-    session.commit()
-    session.refresh(record)
+    await session.commit()
+    await session.refresh(record)
 
-    company_names = _company_names(session, {record.company_id})
-    return _document_payload(record, company_names)
-
-
-def _store_memory(payload: AiMemoryCreate, session: Session) -> AiMemory:
-    memory = AiMemory(**payload.model_dump(exclude_none=True))
-    session.add(memory)
-    session.commit()
-    session.refresh(memory)
-    return memory
+    names = await session.run_sync(company_names, {record.company_id})
+    return _document_payload(record, names)
 
 
 def _document_payload(record: AiMemory, company_names: dict[str, str] | None = None) -> DocumentPayload:
@@ -318,12 +322,20 @@ def _document_payload(record: AiMemory, company_names: dict[str, str] | None = N
     )
 
 
+def _extraction_kind(filename: str, content_type: str, text: str) -> str:
+    if "pdf" in filename.lower() or content_type.lower() == "application/pdf":
+        return "pdf"
+    return "text" if text else "binary"
+
+
 def _extract_text(filename: str, content_type: str, raw_bytes: bytes) -> str:
     lowered_name = filename.lower()
     lowered_type = content_type.lower()
 
     if "pdf" in lowered_name or lowered_type == "application/pdf":
-        if not PdfReader:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
             raise HTTPException(status_code=500, detail="PDF support is not available")
         try:
             pdf = PdfReader(io.BytesIO(raw_bytes))
@@ -355,11 +367,11 @@ def _extract_text(filename: str, content_type: str, raw_bytes: bytes) -> str:
         return raw_bytes.decode("latin-1", errors="replace")
 
 
-def _load_documents(ids: list[str], current_user: User, session: Session) -> list[dict[str, Any]]:
+async def _load_documents(ids: list[str], current_user: User, session: AsyncSession) -> list[dict[str, Any]]:
     documents: list[dict[str, Any]] = []
 
     for doc_id in ids:
-        record = session.get(AiMemory, doc_id)
+        record = await session.get(AiMemory, doc_id)
         if not record:
             raise HTTPException(status_code=404, detail="Document not found")
 
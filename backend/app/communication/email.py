@@ -1,6 +1,6 @@
-import aiosmtplib
 from email.message import EmailMessage
 
+from app.admin.prometheus import EMAIL_SENDS
 from app.config import get_settings
 
 
@@ -18,15 +18,22 @@ async def send_mail(message: EmailMessage) -> None:
     settings = get_settings()
     use_tls = bool(settings.smtp_use_tls)
     start_tls = bool(settings.smtp_starttls) if not use_tls else False
-    await aiosmtplib.send(
-        message,
-        hostname=settings.smtp_host,
-        port=settings.smtp_port,
-        username=settings.smtp_user,
-        password=settings.smtp_pass,
-        start_tls=start_tls,
-        use_tls=use_tls,
-    )
+    import aiosmtplib
+
+    try:
+        await aiosmtplib.send(
+            message,
+            hostname=settings.smtp_host,
+            port=settings.smtp_port,
+            username=settings.smtp_user,
+            password=settings.smtp_pass,
+            start_tls=start_tls,
+            use_tls=use_tls,
+        )
+    except Exception:
+        EMAIL_SENDS.labels("failed").inc()
+        raise
+    EMAIL_SENDS.labels("sent").inc()
 
 
 def smtp_configured() -> bool:
@@ -0,0 +1,150 @@
+"""Per-process cache of company records used to resolve the request tenant.
+
+Entries expire after ``TENANT_CACHE_TTL_SECONDS`` and are dropped as soon as
+a transaction that changed the company commits in this process; other
+workers pick up the change when their entry expires.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from time import monotonic
+from types import MappingProxyType
+from typing import Any
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.companies.models import Company
+from app.config import get_settings
+
+# Longer values can't be company ids; answer them without a query.
+MAX_COMPANY_ID_LENGTH = 64
+
+
+@dataclass(frozen=True)
+class Tenant:
+    id: str
+    name: str
+    domain: str
+    settings: Mapping[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_company(cls, company: Company) -> "Tenant":
+        return cls(
+            id=company.id,
+            name=company.name,
+            domain=company.domain,
+            settings=MappingProxyType(dict(company.settings or {})),
+        )
+
+
+class TenantCache:
+    """LRU of ``Tenant`` records with a time-to-live.
+
+    Unknown ids are not remembered, so requests naming made-up companies
+    cannot push real tenants out of the cache.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Tenant]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, company_id: str) -> tuple[bool, Tenant | None]:
+        """Return ``(hit, tenant)`` without touching the database; ids too long to exist are a ``None`` hit."""
+
+        if len(company_id) > MAX_COMPANY_ID_LENGTH:
+            return True, None
+        with self._lock:
+            entry = self._entries.get(company_id)
+            if entry is None:
+                return False, None
+            if entry[0] < monotonic():
+                del self._entries[company_id]
+                return False, None
+            self._entries.move_to_end(company_id)
+            return True, entry[1]
+
+    def get(self, session: Session, company_id: str) -> Tenant | None:
+        return self.get_many(session, [company_id]).get(company_id)
+
+    def get_many(self, session: Session, company_ids: Iterable[str | None]) -> dict[str, Tenant]:
+        """Resolve several companies with at most one query for the ones not cached."""
+
+        found: dict[str, Tenant] = {}
+        missing: set[str] = set()
+        for company_id in set(filter(None, company_ids)):
+            hit, tenant = self.lookup(company_id)
+            if not hit:
+                missing.add(company_id)
+            elif tenant is not None:
+                found[company_id] = tenant
+
+        if missing:
+            rows = session.exec(select(Company).where(Company.id.in_(missing))).all()
+            loaded = {row.id: Tenant.from_company(row) for row in rows}
+            self._store(loaded)
+            found.update(loaded)
+        return found
+
+    def invalidate(self, company_ids: Iterable[str]) -> None:
+        with self._lock:
+            for company_id in company_ids:
+                self._entries.pop(company_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, tenants: dict[str, Tenant]) -> None:
+        expires = monotonic() + self.ttl
+        with self._lock:
+            for company_id, tenant in tenants.items():
+                self._entries[company_id] = (expires, tenant)
+                self._entries.move_to_end(company_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_settings = get_settings()
+tenant_cache = TenantCache(_settings.tenant_cache_ttl_seconds, _settings.tenant_cache_size)
+
+
+def company_names(session: Session, company_ids: Iterable[str | None]) -> dict[str, str]:
+    return {company_id: tenant.name for company_id, tenant in tenant_cache.get_many(session, company_ids).items()}
+
+
+_CHANGED_KEY = "phill_changed_companies"
+
+
+def _collect_changed(session: Session, _flush_context) -> None:
+    changed = {
+        obj.id for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, Company) and obj.id
+    }
+    if changed:
+        session.info.setdefault(_CHANGED_KEY, set()).update(changed)
+
+
+def _invalidate_committed(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        tenant_cache.invalidate(changed)
+
+
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def track_company_changes() -> None:
+    for name, listener in (
+        ("after_flush", _collect_changed),
+        ("after_commit", _invalidate_committed),
+        ("after_rollback", _discard_changes),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
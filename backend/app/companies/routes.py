@@ -5,6 +5,7 @@ from app.companies.models import Company
 from app.companies.schemas import CompanyCreate, CompanyRead
 from app.companies.service import create_company
 from app.db import get_session
+from app.replica import get_read_session
 from app.security.dependencies import require_role
 from app.users.permissions import ROLE_FOUNDER
 
@@ -23,7 +24,7 @@ def register_company(
 
 @router.get("/", response_model=list[CompanyRead])
 def list_companies(
-    session: Session = Depends(get_session), current_user=Depends(require_role(ROLE_FOUNDER))
+    session: Session = Depends(get_read_session), current_user=Depends(require_role(ROLE_FOUNDER))
 ) -> list[CompanyRead]:
     companies = session.exec(select(Company)).all()
     if not companies:
@@ -2,11 +2,8 @@ from sqlmodel import Session
 
 from app.companies.models import Company
 from app.companies.schemas import CompanyCreate
+from app.utils.persistence import insert_row
 
 
 def create_company(payload: CompanyCreate, session: Session) -> Company:
-    company = Company(**payload.model_dump())
-    session.add(company)
-    session.commit()
-    session.refresh(company)
-    return company
+    return insert_row(session, Company(**payload.model_dump()))
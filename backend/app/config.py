@@ -11,13 +11,42 @@ class Settings(BaseSettings):
     frontend_url: str = Field("http://localhost:3000", alias="FRONTEND_URL")
 
     database_url: str = Field(..., alias="DATABASE_URL")
+    database_async_url: str | None = Field(None, alias="DATABASE_ASYNC_URL")
+    db_pool_size: int = Field(5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(30.0, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_statement_timeout_ms: int = Field(0, alias="DB_STATEMENT_TIMEOUT_MS")
+    db_liveness: str = Field("pre_ping", alias="DB_LIVENESS")
+    db_liveness_idle_seconds: float = Field(30.0, alias="DB_LIVENESS_IDLE_SECONDS")
+    db_migrate_on_startup: bool = Field(True, alias="DB_MIGRATE_ON_STARTUP")
+    db_startup_timeout_seconds: float = Field(60.0, alias="DB_STARTUP_TIMEOUT_SECONDS")
+    warmup_db_connections: int = Field(0, alias="WARMUP_DB_CONNECTIONS")
+    warmup_imports: bool = Field(False, alias="WARMUP_IMPORTS")
+    database_read_url: str | None = Field(None, alias="DATABASE_READ_URL")
+    database_async_read_url: str | None = Field(None, alias="DATABASE_ASYNC_READ_URL")
+    read_replica_max_lag_seconds: float = Field(10.0, alias="READ_REPLICA_MAX_LAG_SECONDS")
+    read_replica_check_seconds: float = Field(5.0, alias="READ_REPLICA_CHECK_SECONDS")
+    read_replica_pin_seconds: float = Field(5.0, alias="READ_REPLICA_PIN_SECONDS")
 
     jwt_secret: str = Field(..., alias="JWT_SECRET")
     jwt_expire_minutes: int = Field(30, alias="JWT_EXPIRE_MINUTES")
     jwt_refresh_expire_days: int = Field(30, alias="JWT_REFRESH_EXPIRE_DAYS")
+    refresh_revocation_sync_seconds: int = Field(30, alias="REFRESH_REVOCATION_SYNC_SECONDS")
+    refresh_reuse_grace_seconds: int = Field(10, alias="REFRESH_REUSE_GRACE_SECONDS")
     password_reset_expire_minutes: int = Field(30, alias="PASSWORD_RESET_EXPIRE_MINUTES")
     password_pepper: str = Field(..., alias="PASSWORD_PEPPER")
 
+    retention_enabled: bool = Field(True, alias="RETENTION_ENABLED")
+    retention_interval_seconds: int = Field(3600, alias="RETENTION_INTERVAL_SECONDS")
+    retention_batch_size: int = Field(500, alias="RETENTION_BATCH_SIZE")
+    token_retention_hours: int = Field(24, alias="TOKEN_RETENTION_HOURS")
+    reset_request_retention_days: int = Field(90, alias="RESET_REQUEST_RETENTION_DAYS")
+    access_request_retention_days: int = Field(180, alias="ACCESS_REQUEST_RETENTION_DAYS")
+
+    user_import_batch_size: int = Field(500, alias="USER_IMPORT_BATCH_SIZE")
+    user_import_hash_workers: int = Field(0, alias="USER_IMPORT_HASH_WORKERS")
+
     smtp_host: str | None = Field(None, alias="SMTP_HOST")
     smtp_port: int | None = Field(None, alias="SMTP_PORT")
     smtp_user: str | None = Field(None, alias="SMTP_USER")
@@ -34,9 +63,49 @@ class Settings(BaseSettings):
 
     openai_api_key: str | None = Field(None, alias="OPENAI_API_KEY")
     ai_model: str = Field("gpt-5.1", alias="AI_MODEL")
+    document_upload_max_bytes: int = Field(25 * 1024 * 1024, alias="DOCUMENT_UPLOAD_MAX_BYTES")
     ai_document_max_bytes: int | None = Field(None, alias="AI_DOCUMENT_MAX_BYTES")
     ai_document_max_text: int | None = Field(None, alias="AI_DOCUMENT_MAX_TEXT")
 
+    rate_limit_backend: str = Field("memory", alias="RATE_LIMIT_BACKEND")
+    rate_limit_sqlite_path: str = Field("/tmp/phill-rate-limit.db", alias="RATE_LIMIT_SQLITE_PATH")
+    rate_limit_redis_url: str | None = Field(None, alias="RATE_LIMIT_REDIS_URL")
+    rate_limit_batch: int = Field(5, alias="RATE_LIMIT_BATCH")
+    rate_limit_policies: list[dict] | None = Field(None, alias="RATE_LIMIT_POLICIES")
+    rate_limit_trusted_proxies: list[str] = Field(default_factory=list, alias="RATE_LIMIT_TRUSTED_PROXIES")
+
+    log_format: str = Field("json", alias="LOG_FORMAT")
+    log_level: str = Field("INFO", alias="LOG_LEVEL")
+    log_queue_size: int = Field(10_000, alias="LOG_QUEUE_SIZE")
+    log_sample_rate: float = Field(0.01, alias="LOG_SAMPLE_RATE")
+    log_sampled_routes: list[str] = Field(
+        default_factory=lambda: ["/health", "/api/health", "/metrics"], alias="LOG_SAMPLED_ROUTES"
+    )
+    log_slow_request_seconds: float = Field(1.0, alias="LOG_SLOW_REQUEST_SECONDS")
+
+    sql_slow_query_ms: float = Field(200.0, alias="SQL_SLOW_QUERY_MS")
+    sql_n_plus_one_threshold: int = Field(5, alias="SQL_N_PLUS_ONE_THRESHOLD")
+
+    profiling_enabled: bool = Field(True, alias="PROFILING_ENABLED")
+    profiling_dir: str = Field("/tmp/phill-profiles", alias="PROFILING_DIR")
+    profiling_max_stored: int = Field(50, alias="PROFILING_MAX_STORED")
+    profiling_sample_interval_ms: float = Field(2.0, alias="PROFILING_SAMPLE_INTERVAL_MS")
+
+    metrics_enabled: bool = Field(True, alias="METRICS_ENABLED")
+    metrics_token: str | None = Field(None, alias="METRICS_TOKEN")
+
+    compression_enabled: bool = Field(True, alias="COMPRESSION_ENABLED")
+    compression_min_size: int = Field(1024, alias="COMPRESSION_MIN_SIZE")
+    compression_content_types: list[str] = Field(
+        default_factory=lambda: ["application/json", "text/", "application/javascript", "application/xml", "image/svg+xml"],
+        alias="COMPRESSION_CONTENT_TYPES",
+    )
+    compression_gzip_level: int = Field(6, alias="COMPRESSION_GZIP_LEVEL")
+    compression_brotli_quality: int = Field(4, alias="COMPRESSION_BROTLI_QUALITY")
+
+    tenant_cache_ttl_seconds: float = Field(60.0, alias="TENANT_CACHE_TTL_SECONDS")
+    tenant_cache_size: int = Field(1024, alias="TENANT_CACHE_SIZE")
+
     cors_origins: list[str] = Field(default_factory=list, alias="CORS_ORIGINS")
     csp_directives: str | None = Field(None, alias="CSP_DIRECTIVES")
 
@@ -1,39 +1,200 @@
 import logging
+import random
 import time
-from collections.abc import Generator
+from collections import Counter
+from collections.abc import AsyncGenerator, Generator
+from time import monotonic, perf_counter
 
-from sqlalchemy.exc import OperationalError
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.exc import DisconnectionError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.config import get_settings
+from app.admin.metrics import LatencyHistograms
+from app.companies.cache import track_company_changes
+from app.config import Settings, get_settings
+from app.utils.etag import track_collection_versions
 
-settings = get_settings()
-engine = create_engine(settings.database_url, echo=False, pool_pre_ping=True)
+LIVENESS_STRATEGIES = ("pre_ping", "idle", "none")
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
 
 logger = logging.getLogger("phill.db")
 
+# Time spent waiting for a pooled connection, keyed by pool ("sync", "async", "read_sync", "read_async").
+pool_waits = LatencyHistograms(max_routes=4)
+pool_timeouts: Counter[str] = Counter()
+
+
+class _TimedCheckout:
+    """Pool mixin that records how long each checkout waited for a connection."""
+
+    wait_key = "sync"
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts[self.wait_key] += 1
+            raise
+        finally:
+            pool_waits.record(self.wait_key, perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    wait_key = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    wait_key = "async"
+
+
+class TimedReadQueuePool(TimedQueuePool):
+    wait_key = "read_sync"
+
+
+class TimedAsyncReadQueuePool(TimedAsyncQueuePool):
+    wait_key = "read_async"
+
+
+def _check_idle_connections(engine: Engine, idle_seconds: float) -> None:
+    """Ping a connection on checkout only when it sat in the pool longer than ``idle_seconds``."""
+
+    @event.listens_for(engine, "checkin")
+    def _checked_in(dbapi_connection, record) -> None:
+        record.info["phill_checked_in"] = monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checked_out(dbapi_connection, record, proxy) -> None:
+        checked_in = record.info.get("phill_checked_in")
+        if checked_in is None or monotonic() - checked_in < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as exc:
+            # The pool discards this connection and retries the checkout with a fresh one.
+            raise DisconnectionError() from exc
+
+
+def _set_statement_timeout(engine: Engine, timeout_ms: int) -> None:
+    @event.listens_for(engine, "connect")
+    def _connected(dbapi_connection, record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {int(timeout_ms)}")
+        cursor.close()
+        dbapi_connection.commit()
+
+
+def _engine_options(parsed: URL, settings: Settings, poolclass: type) -> dict:
+    liveness = settings.db_liveness.lower()
+    if liveness not in LIVENESS_STRATEGIES:
+        raise ValueError(f"DB_LIVENESS must be one of {', '.join(LIVENESS_STRATEGIES)}")
+
+    options: dict = {"echo": False, "pool_pre_ping": liveness == "pre_ping"}
+    # In-memory SQLite keeps its single shared connection; everything else gets a sized, timed queue pool.
+    if not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")):
+        options.update(
+            poolclass=poolclass,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+    return options
+
+
+def _configure(sync_engine: Engine, parsed: URL, settings: Settings) -> None:
+    if settings.db_liveness.lower() == "idle":
+        _check_idle_connections(sync_engine, settings.db_liveness_idle_seconds)
+    if settings.db_statement_timeout_ms and parsed.get_backend_name() == "postgresql":
+        _set_statement_timeout(sync_engine, settings.db_statement_timeout_ms)
+
+
+def build_engine(url: str, settings: Settings, poolclass: type[QueuePool] = TimedQueuePool) -> Engine:
+    """Create an engine with the pool sizing, liveness check and statement timeout from settings."""
+
+    parsed = make_url(url)
+    new_engine = create_engine(url, **_engine_options(parsed, settings, poolclass))
+    _configure(new_engine, parsed, settings)
+    return new_engine
+
+
+def async_database_url(url: str) -> str:
+    """The same database addressed through its asyncio driver (asyncpg or aiosqlite)."""
+
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver known for {parsed.get_backend_name()}; set DATABASE_ASYNC_URL")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def build_async_engine(
+    url: str, settings: Settings, poolclass: type[AsyncAdaptedQueuePool] = TimedAsyncQueuePool
+) -> AsyncEngine:
+    parsed = make_url(url)
+    new_engine = create_async_engine(url, **_engine_options(parsed, settings, poolclass))
+    _configure(new_engine.sync_engine, parsed, settings)
+    return new_engine
+
+
+settings = get_settings()
+engine = build_engine(settings.database_url, settings)
+async_engine = build_async_engine(
+    settings.database_async_url or async_database_url(settings.database_url), settings
+)
+
+track_collection_versions()
+track_company_changes()
+
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
 
 
-def create_db_and_tables(max_attempts: int = 10, wait_seconds: float = 3.0) -> None:
-    """Create tables, retrying while the database starts up."""
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session for ``async def`` routes; DB I/O awaits on the event loop instead of tying up a threadpool worker.
 
-    for attempt in range(1, max_attempts + 1):
+    Objects are not expired on commit, since reloading them lazily would need
+    I/O outside an ``await``; call ``await session.refresh(obj)`` when fresh
+    server-side values are needed. Sync service code can run on it through
+    ``await session.run_sync(func, *args)``.
+    """
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def wait_for_database(timeout: float | None = None, first_delay: float = 0.05, max_delay: float = 2.0) -> int:
+    """Block until the database accepts a connection and return the number of attempts it took.
+
+    Retries back off exponentially from ``first_delay``, so a database that is
+    a moment behind costs milliseconds rather than a fixed wait, and gives up
+    after ``DB_STARTUP_TIMEOUT_SECONDS``.
+    """
+
+    deadline = monotonic() + (settings.db_startup_timeout_seconds if timeout is None else timeout)
+    delay = first_delay
+    attempt = 0
+    while True:
+        attempt += 1
         try:
-            SQLModel.metadata.create_all(engine)
-            logger.info("Database ready (attempt %s/%s)", attempt, max_attempts)
-            return
+            with engine.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+            return attempt
         except OperationalError as exc:  # pragma: no cover - startup path
-            logger.warning(
-                "Database not ready (attempt %s/%s): %s", attempt, max_attempts, exc
-            )
-            if attempt == max_attempts:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
                 raise
-
-            time.sleep(wait_seconds)
+            logger.warning("Database not ready (attempt %s): %s", attempt, exc)
+            # Jitter keeps workers that start together from retrying in lockstep.
+            time.sleep(min(random.uniform(delay / 2, delay), remaining))
+            delay = min(delay * 2, max_delay)
 
 
 def ping_database() -> tuple[bool, str | None]:
@@ -46,3 +207,34 @@ def ping_database() -> tuple[bool, str | None]:
     except Exception as exc:  # pragma: no cover - environment dependent
         logger.warning("Database ping failed: %s", exc)
         return False, str(exc)
+
+
+def engine_pool_status(target: Engine) -> dict[str, object]:
+    pool = target.pool
+    status: dict[str, object] = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=settings.db_max_overflow,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+        )
+    wait_key = getattr(pool, "wait_key", None)
+    if wait_key:
+        wait = pool_waits.summary(wait_key)
+        status["wait"] = {"checkouts": wait.pop("requests"), **wait, "timeouts": pool_timeouts[wait_key]}
+    return status
+
+
+def pool_status() -> dict[str, object]:
+    """Live occupancy of the sync and async pools plus checkout wait times over the last five minutes."""
+
+    return {
+        "liveness": settings.db_liveness.lower(),
+        "timeout_seconds": settings.db_pool_timeout_seconds,
+        "recycle_seconds": settings.db_pool_recycle_seconds,
+        "statement_timeout_ms": settings.db_statement_timeout_ms or None,
+        "sync": engine_pool_status(engine),
+        "async": engine_pool_status(async_engine.sync_engine),
+    }
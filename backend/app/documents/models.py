@@ -1,11 +1,17 @@
 from datetime import datetime
 from uuid import uuid4
 
+from sqlalchemy import Index
 from sqlmodel import Column, DateTime, Field, SQLModel
 
 
 class Document(SQLModel, table=True):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset pagination (newest first) within a company, and across all of them for founders.
+        Index("ix_documents_company_created", "company_id", "created_at", "id"),
+        Index("ix_documents_created", "created_at", "id"),
+    )
 
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     company_id: str = Field(foreign_key="companies.id", index=True)
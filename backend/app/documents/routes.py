@@ -1,25 +1,28 @@
+import logging
 from pathlib import Path
+from time import monotonic
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, status
 from sqlmodel import Session, select
 
+from app.admin.prometheus import UPLOAD_LATENCY, UPLOAD_SIZE
+from app.companies.cache import Tenant
+from app.config import get_settings
 from app.db import get_session
 from app.documents.models import Document
 from app.documents.schemas import DocumentCreate, DocumentRead
 from app.documents.upload import LocalDocumentStore
-from app.security.dependencies import get_current_active_user
+from app.replica import get_read_session
+from app.security.dependencies import get_current_active_user, get_current_tenant
 from app.users.models import User
 from app.users.permissions import ROLE_FOUNDER, has_role
+from app.utils.pagination import Page, page_params, page_rows, paginate
+from app.utils.persistence import insert_row
 
-router = APIRouter()
-store = LocalDocumentStore(base_dir=Path("/tmp/uploads"))
-
+logger = logging.getLogger("phill.documents")
 
-def _persist(doc: Document, session: Session) -> Document:
-    session.add(doc)
-    session.commit()
-    session.refresh(doc)
-    return doc
+router = APIRouter()
+store = LocalDocumentStore(base_dir=Path("/tmp/uploads"), max_bytes=get_settings().document_upload_max_bytes)
 
 
 @router.post("/", response_model=DocumentRead)
@@ -27,14 +30,15 @@ def create_document(
     payload: DocumentCreate,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user),
+    tenant: Tenant = Depends(get_current_tenant),
 ) -> DocumentRead:
     doc = Document(
-        company_id=current_user.company_id,
+        company_id=tenant.id,
         uploaded_by=current_user.id,
         name=payload.name,
         path=payload.path,
     )
-    _persist(doc, session)
+    insert_row(session, doc)
     return DocumentRead.model_validate(doc)
 
 
@@ -43,32 +47,46 @@ def upload_document(
     file: UploadFile,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user),
+    tenant: Tenant = Depends(get_current_tenant),
 ) -> DocumentRead:
     if not file.filename:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File name required")
-    saved_path = store.save(current_user.company_id, file.filename, file.file.read())
+    start = monotonic()
+    # The form parser has spooled the upload to a temp file; copy it over in chunks rather than reading it whole.
+    stored = store.save(tenant.id, file.filename, file.file)
+    UPLOAD_SIZE.labels("documents").observe(stored.size)
+    UPLOAD_LATENCY.labels("documents").observe(monotonic() - start)
+    logger.info("Stored upload %s (%s bytes, sha256 %s)", stored.path, stored.size, stored.sha256)
     doc = Document(
-        company_id=current_user.company_id,
+        company_id=tenant.id,
         name=file.filename,
-        path=saved_path,
+        path=stored.path,
         uploaded_by=current_user.id,
     )
-    _persist(doc, session)
+    insert_row(session, doc)
     return DocumentRead.model_validate(doc)
 
 
 @router.get("/", response_model=list[DocumentRead])
 def list_documents(
+    request: Request,
+    response: Response,
     company_id: str | None = Query(default=None),
-    session: Session = Depends(get_session),
+    uploaded_by: str | None = Query(default=None),
+    page: Page = Depends(page_params),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user),
+    tenant: Tenant = Depends(get_current_tenant),
 ) -> list[DocumentRead]:
     query = select(Document)
     if has_role(current_user.role, ROLE_FOUNDER):
-        if company_id:
-            query = query.where(Document.company_id == company_id)
+        # Founders see every company unless they pick one with ?company_id= or X-Company-ID.
+        if company_id or getattr(request.state, "company_id", None):
+            query = query.where(Document.company_id == (company_id or tenant.id))
     else:
-        query = query.where(Document.company_id == current_user.company_id)
+        query = query.where(Document.company_id == tenant.id)
+    if uploaded_by:
+        query = query.where(Document.uploaded_by == uploaded_by)
 
-    docs = session.exec(query).all()
+    docs = page_rows(request, response, session.exec(paginate(query, Document, page)).all(), page)
     return [DocumentRead.model_validate(doc) for doc in docs]
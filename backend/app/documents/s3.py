@@ -1,7 +1,6 @@
-import boto3
-
-
 def s3_client(access_key: str | None = None, secret_key: str | None = None, region: str | None = None):
+    import boto3
+
     return boto3.client(
         "s3",
         aws_access_key_id=access_key,
@@ -1,14 +1,73 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException, status
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    path: str
+    size: int
+    sha256: str
 
 
 class LocalDocumentStore:
-    def __init__(self, base_dir: Path):
+    """Writes uploads under ``base_dir/<company_id>/``, streaming so memory use does not grow with file size."""
+
+    def __init__(self, base_dir: Path, max_bytes: int | None = None, chunk_size: int = CHUNK_SIZE):
         self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
-    def save(self, company_id: str, filename: str, content: bytes) -> str:
+    def save(self, company_id: str, filename: str, source: BinaryIO) -> StoredFile:
+        """Copy ``source`` in chunks to a temp file, fsync it and rename it into place.
+
+        Readers never see a partial file: the name only appears once the
+        content is on disk. An upload over ``max_bytes`` is rejected with 413
+        as soon as it crosses the limit and leaves nothing behind.
+        """
+
+        name = Path(filename).name
+        if name in ("", ".", ".."):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file name")
         target_dir = self.base_dir / company_id
         target_dir.mkdir(parents=True, exist_ok=True)
-        path = target_dir / filename
-        path.write_bytes(content)
-        return str(path)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, temporary = tempfile.mkstemp(dir=target_dir, prefix=".upload-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := source.read(self.chunk_size):
+                    size += len(chunk)
+                    if self.max_bytes and size > self.max_bytes:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"{name} is too large (max {self.max_bytes} bytes)",
+                        )
+                    digest.update(chunk)
+                    out.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temporary, target_dir / name)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+        _fsync_directory(target_dir)
+        return StoredFile(path=str(target_dir / name), size=size, sha256=digest.hexdigest())
+
+
+def _fsync_directory(directory: Path) -> None:
+    # Persist the rename itself; without this a crash can lose the new directory entry.
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
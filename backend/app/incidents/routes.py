@@ -1,67 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.companies.cache import Tenant
+from app.db import get_async_session
+from app.replica import get_async_read_session
 from app.incidents.audit import audit_entry
 from app.incidents.models import Incident
 from app.incidents.schemas import IncidentCreate, IncidentRead
 from app.incidents.workflow import escalate_status
-from app.security.dependencies import get_current_active_user
+from app.security.dependencies import get_current_active_user_async, get_current_tenant_async
 from app.users.models import User
 from app.users.permissions import ROLE_SUPERVISOR, has_role
+from app.utils.etag import collection_etag, conditional_response
+from app.utils.pagination import Page, page_params, page_rows, paginate
+from app.utils.persistence import insert_row_async
 
 router = APIRouter()
 
 
-def _persist(session: Session, incident: Incident) -> Incident:
-    session.add(incident)
-    session.commit()
-    session.refresh(incident)
-    return incident
-
-
 @router.post("/", response_model=IncidentRead)
-def create_incident(
+async def create_incident(
     payload: IncidentCreate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user_async),
+    tenant: Tenant = Depends(get_current_tenant_async),
 ) -> IncidentRead:
     incident = Incident(
-        company_id=current_user.company_id,
+        company_id=tenant.id,
         user_id=current_user.id,
         type=payload.type,
         description=payload.description,
         status=payload.status,
     )
-    _persist(session, incident)
+    await insert_row_async(session, incident)
     return IncidentRead.model_validate(incident)
 
 
 @router.post("/{incident_id}/escalate", response_model=IncidentRead)
-def escalate_incident(
+async def escalate_incident(
     incident_id: str,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user_async),
+    tenant: Tenant = Depends(get_current_tenant_async),
 ) -> IncidentRead:
     if not has_role(current_user.role, ROLE_SUPERVISOR):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient role to escalate")
-    incident = session.get(Incident, incident_id)
-    if not incident or incident.company_id != current_user.company_id:
+    incident = await session.get(Incident, incident_id)
+    if not incident or incident.company_id != tenant.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found")
     incident.status = escalate_status(incident.status)
-    _persist(session, incident)
+    session.add(incident)
+    await session.commit()
     audit_entry("escalate", incident.user_id, incident_id)
     return IncidentRead.model_validate(incident)
 
 
 @router.get("/", response_model=list[IncidentRead])
-def list_incidents(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+async def list_incidents(
+    request: Request,
+    response: Response,
+    status_filter: str | None = Query(default=None, alias="status"),
+    incident_type: str | None = Query(default=None, alias="type"),
+    user_id: str | None = Query(default=None),
+    page: Page = Depends(page_params),
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: User = Depends(get_current_active_user_async),
+    tenant: Tenant = Depends(get_current_tenant_async),
 ) -> list[IncidentRead]:
-    query = select(Incident).where(Incident.company_id == current_user.company_id)
-    if not has_role(current_user.role, ROLE_SUPERVISOR):
-        query = query.where(Incident.user_id == current_user.id)
+    # Only supervisors see other users' incidents; everyone else is limited to their own.
+    owner = user_id if has_role(current_user.role, ROLE_SUPERVISOR) else current_user.id
+    etag = await session.run_sync(
+        collection_etag, "incidents", tenant.id, owner, status_filter, incident_type, page
+    )
+    if (not_modified := conditional_response(request, response, etag)) is not None:
+        return not_modified
+
+    query = select(Incident).where(Incident.company_id == tenant.id)
+    if owner:
+        query = query.where(Incident.user_id == owner)
+    if status_filter:
+        query = query.where(Incident.status == status_filter)
+    if incident_type:
+        query = query.where(Incident.type == incident_type)
 
-    incidents = session.exec(query).all()
+    incidents = page_rows(request, response, (await session.exec(paginate(query, Incident, page))).all(), page)
     return [IncidentRead.model_validate(item) for item in incidents]
@@ -1,20 +1,33 @@
-from fastapi import FastAPI
-
-from app.ai.router import router as ai_router
-from app.db import create_db_and_tables
-from app.security.auth import router as auth_router
-from app.users.routes import router as users_router
-from app.companies.routes import router as companies_router
-from app.incidents.routes import router as incidents_router
-from app.documents.routes import router as documents_router
-from app.tickets.routes import router as tickets_router
-from app.admin.routes import router as admin_router
-from app.bootstrap import bootstrap_founder_from_env
-from app.middleware.logging import install_logging_middleware
-from app.middleware.rate_limit import install_rate_limit_middleware
-from app.middleware.tenant import install_tenant_middleware
-from app.middleware.security import install_security_headers
-from app.utils.response import add_exception_handlers
+from time import perf_counter
+
+# Taken before the imports below so boot timings include them.
+_imports_started = perf_counter()
+
+from fastapi import FastAPI  # noqa: E402
+
+from app.ai.router import router as ai_router  # noqa: E402
+from app.admin.prometheus import install_metrics  # noqa: E402
+from app.db import async_engine, engine  # noqa: E402
+from app.replica import read_engines  # noqa: E402
+from app.security.auth import router as auth_router  # noqa: E402
+from app.users.routes import router as users_router  # noqa: E402
+from app.companies.routes import router as companies_router  # noqa: E402
+from app.incidents.routes import router as incidents_router  # noqa: E402
+from app.documents.routes import router as documents_router  # noqa: E402
+from app.tickets.routes import router as tickets_router  # noqa: E402
+from app.admin.routes import router as admin_router  # noqa: E402
+from app.search.routes import router as search_router  # noqa: E402
+from app.startup import record_import_time, start_up, warm_up  # noqa: E402
+from app.users.retention import stop_retention_sweeper  # noqa: E402
+from app.middleware.compression import install_compression_middleware  # noqa: E402
+from app.middleware.logging import install_logging_middleware  # noqa: E402
+from app.middleware.profiling import install_profiling_middleware  # noqa: E402
+from app.middleware.query_stats import install_query_stats_middleware  # noqa: E402
+from app.middleware.rate_limit import install_rate_limit_middleware  # noqa: E402
+from app.middleware.replica import install_read_your_writes_middleware  # noqa: E402
+from app.middleware.tenant import install_tenant_middleware  # noqa: E402
+from app.middleware.security import install_security_headers  # noqa: E402
+from app.utils.response import add_exception_handlers  # noqa: E402
 
 
 app = FastAPI(title="Phill API", version="0.1.0")
@@ -22,15 +35,32 @@ app = FastAPI(title="Phill API", version="0.1.0")
 
 @app.on_event("startup")
 def on_startup() -> None:
-    create_db_and_tables()
-    bootstrap_founder_from_env()
+    start_up()
+
+
+@app.on_event("startup")
+async def on_warm_up() -> None:
+    await warm_up()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    stop_retention_sweeper()
+
+engines = {"sync": engine, "async": async_engine.sync_engine, **read_engines()}
 
 # Install middleware stack
+install_profiling_middleware(app)
 install_logging_middleware(app)
+# Outside the request log so its line can include the request's query count.
+install_query_stats_middleware(app, engines)
 install_rate_limit_middleware(app)
 install_tenant_middleware(app)
+install_read_your_writes_middleware(app)
+install_compression_middleware(app)
 install_security_headers(app)
 add_exception_handlers(app)
+install_metrics(app, engines)
 
 # Routers
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
@@ -40,6 +70,7 @@ app.include_router(incidents_router, prefix="/api/incidents", tags=["incidents"]
 app.include_router(documents_router, prefix="/api/documents", tags=["documents"])
 app.include_router(tickets_router, prefix="/api/tickets", tags=["tickets"])
 app.include_router(ai_router, prefix="/api/ai", tags=["ai"])
+app.include_router(search_router, prefix="/api/search", tags=["search"])
 app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
 
 
@@ -52,3 +83,6 @@ def health_check() -> dict[str, str]:
 def api_health_check() -> dict[str, str]:
     """Health endpoint that aligns with the `/api` proxy path."""
     return {"status": "ok"}
+
+
+record_import_time(perf_counter() - _imports_started)
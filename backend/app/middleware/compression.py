@@ -0,0 +1,188 @@
+import zlib
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Bodies larger than this are compressed in the threadpool so the event loop keeps serving other requests.
+OFFLOAD_BYTES = 256 * 1024
+
+
+class _Gzip:
+    encoding = "gzip"
+
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    encoding = "br"
+
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def _accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """Negotiated brotli/gzip compression for text-like responses.
+
+    Single-message responses below ``minimum_size`` are left alone. Streamed
+    responses are compressed chunk by chunk and flushed after each one, so
+    nothing is held back waiting for the rest of the body.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        content_types: list[str],
+        gzip_level: int,
+        brotli_quality: int,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(value.lower() for value in content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoder(self, scope: Scope):
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and accepted.get("br", 0) > 0:
+            return lambda: _Brotli(self.brotli_quality)
+        if accepted.get("gzip", 0) > 0:
+            return lambda: _Gzip(self.gzip_level)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoder_factory = self._choose_encoder(scope)
+        if encoder_factory is None:
+            await self.app(scope, receive, self._with_vary(send))
+            return
+
+        start_message: Message | None = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message.get("headers", []))
+                eligible = self._eligible(headers)
+                if eligible:
+                    MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+                length = headers.get("content-length")
+                passthrough = (
+                    not eligible
+                    or "content-encoding" in headers
+                    or message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or (length is not None and int(length) < self.minimum_size)
+                )
+                if passthrough:
+                    await send(message)
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = encoder_factory()
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = encoder.encoding
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    compressed = await self._compress(encoder.finish, body)
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send(start_message)
+
+            if more_body:
+                chunk = await self._compress(encoder.compress, body)
+            else:
+                chunk = await self._compress(encoder.finish, body)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _eligible(self, headers: Headers) -> bool:
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith(self.content_types) and content_type != "text/event-stream"
+
+    def _with_vary(self, send: Send) -> Send:
+        """Mark compressible responses as varying by encoding even when this client gets them uncompressed."""
+
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start" and self._eligible(Headers(raw=message.get("headers", []))):
+                MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            await send(message)
+
+        return send_with_vary
+
+    @staticmethod
+    async def _compress(func, body: bytes) -> bytes:
+        if len(body) > OFFLOAD_BYTES:
+            return await run_in_threadpool(func, body)
+        return func(body)
+
+
+def install_compression_middleware(app: FastAPI) -> None:
+    settings = get_settings()
+    if not settings.compression_enabled:
+        return
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        content_types=settings.compression_content_types,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
@@ -1,17 +1,203 @@
+import json
 import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from time import monotonic
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.admin.metrics import latency_histograms, route_label, route_template
+from app.admin.prometheus import record_request
+from app.admin.query_stats import current_query_stats
+from app.config import Settings, get_settings
 
 logger = logging.getLogger("phill.api")
-logging.basicConfig(level=logging.INFO)
 
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra`` and goes into the JSON.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the standard fields plus any ``extra`` values."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hand records to the writer thread without ever waiting on it.
+
+    Records are queued unformatted (formatting happens on the writer thread)
+    and dropped, not blocked on, when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _RequestIdFilter(logging.Filter):
+    """Tag records logged while handling a request with its id."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+
+_listener: QueueListener | None = None
+
+
+def configure_logging(settings: Settings | None = None) -> None:
+    """Route all logging through a bounded queue drained by a background writer thread."""
+
+    global _listener
+    settings = settings or get_settings()
+    stop_logging()
+
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.log_format.lower() == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    handler.addFilter(_RequestIdFilter())
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.log_level.upper())
+
+    _listener = QueueListener(handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _request_id(headers: Headers) -> str:
+    supplied = headers.get(REQUEST_ID_HEADER)
+    if supplied and _REQUEST_ID_PATTERN.match(supplied):
+        return supplied
+    return uuid.uuid4().hex
+
+
+class RequestLoggingMiddleware:
+    """Log and record one structured entry per request once the response has been sent.
+
+    Healthy (non-error, not slow) requests on ``LOG_SAMPLED_ROUTES`` are only
+    logged at ``LOG_SAMPLE_RATE``; metrics still see every request.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings) -> None:
+        self.app = app
+        self.sample_rate = settings.log_sample_rate
+        self.sampled_routes = frozenset(settings.log_sampled_routes)
+        self.slow_seconds = settings.log_slow_request_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-def install_logging_middleware(app: FastAPI) -> None:
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):  # type: ignore[override]
         start = monotonic()
-        response = await call_next(request)
-        duration = monotonic() - start
-        logger.info("%s %s completed in %.3fs", request.method, request.url.path, duration)
-        return response
+        status_code = 500
+        request_id = _request_id(Headers(scope=scope))
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", []).append((b"x-request-id", request_id.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = monotonic() - start
+            template = route_template(scope)
+            latency_histograms.record(route_label(scope), duration)
+            record_request(scope["method"], template, status_code, duration)
+            if self._should_log(template, status_code, duration):
+                state = scope.get("state", {})
+                stats = current_query_stats.get()
+                logger.log(
+                    logging.ERROR if status_code >= 500 else logging.INFO,
+                    "%s %s %s %.3fs",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    duration,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": template,
+                        "status": status_code,
+                        "duration_ms": round(duration * 1000, 2),
+                        "user_id": state.get("user_id"),
+                        "company_id": state.get("user_company_id") or state.get("company_id"),
+                        "request_id": request_id,
+                        "db_queries": stats.count if stats else None,
+                        "db_ms": stats.milliseconds if stats else None,
+                    },
+                )
+            request_id_var.reset(token)
+
+    def _should_log(self, template: str, status_code: int, duration: float) -> bool:
+        if status_code >= 400 or duration >= self.slow_seconds or template not in self.sampled_routes:
+            return True
+        return random.random() < self.sample_rate
+
+
+def install_logging_middleware(app: FastAPI) -> None:
+    settings = get_settings()
+    configure_logging(settings)
+
+    def _restart_writer() -> None:
+        if _listener is None:
+            configure_logging(settings)
+
+    app.add_event_handler("startup", _restart_writer)
+    app.add_event_handler("shutdown", stop_logging)
+    app.add_middleware(RequestLoggingMiddleware, settings=settings)
@@ -0,0 +1,122 @@
+import uuid
+from datetime import datetime, timezone
+from time import monotonic
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, HTTPException
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.admin.metrics import route_template
+from app.admin.profiling import ProfileStore, RequestProfile, current_profile, instrument_sql
+from app.config import get_settings
+from app.db import async_engine, engine
+from app.replica import read_engines
+from app.security.dependencies import user_from_token
+from app.users.permissions import ROLE_ADMIN, has_role
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-ID"
+
+
+def profile_store() -> ProfileStore:
+    settings = get_settings()
+    return ProfileStore(settings.profiling_dir, settings.profiling_max_stored)
+
+
+def _admin_id(authorization: str | None) -> str | None:
+    """Return the caller's user id when the bearer token belongs to an active admin."""
+
+    if not authorization or authorization[:7].lower() != "bearer ":
+        return None
+    with Session(engine) as session:
+        try:
+            user = user_from_token(authorization[7:].strip(), session)
+        except HTTPException:
+            return None
+        if user.disabled or not has_role(user.role, ROLE_ADMIN):
+            return None
+        return str(user.id)
+
+
+class ProfilingMiddleware:
+    """Profile a single request when an admin sends ``X-Profile: 1`` or ``?profile=1``.
+
+    Unflagged requests only pay for the header/query check; the admin's
+    token is validated before anything is profiled, and non-admins simply
+    get an unprofiled response.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, interval: float) -> None:
+        self.app = app
+        self.store = store
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        user_id = await run_in_threadpool(_admin_id, headers.get("authorization"))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        instrument_sql(engine)
+        instrument_sql(async_engine.sync_engine)
+        for read_engine in read_engines().values():
+            instrument_sql(read_engine)
+        profile = RequestProfile(uuid.uuid4().hex, self.interval)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", []).append((PROFILE_ID_HEADER.lower().encode(), profile.id.encode()))
+            await send(message)
+
+        started_at = datetime.now(timezone.utc)
+        start = monotonic()
+        token = current_profile.set(profile)
+        profile.sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.sampler.stop()
+            current_profile.reset(token)
+            report = profile.report(
+                method=scope["method"],
+                path=scope["path"],
+                route=route_template(scope),
+                status=status_code,
+                user_id=user_id,
+                request_id=scope.get("state", {}).get("request_id"),
+                started_at=started_at.isoformat(),
+                duration_ms=round((monotonic() - start) * 1000, 3),
+            )
+            await run_in_threadpool(self.store.save, report)
+
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return value not in (b"", b"0", b"false")
+        query = scope.get("query_string", b"")
+        if b"profile=" in query:
+            return parse_qs(query.decode("latin-1")).get("profile", ["0"])[-1] not in ("", "0", "false")
+        return False
+
+
+def install_profiling_middleware(app: FastAPI) -> None:
+    settings = get_settings()
+    if not settings.profiling_enabled:
+        return
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store(),
+        interval=settings.profiling_sample_interval_ms / 1000,
+    )
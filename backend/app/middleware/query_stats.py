@@ -0,0 +1,66 @@
+import logging
+
+from fastapi import FastAPI
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.admin.metrics import route_template
+from app.admin.query_stats import QueryStats, current_query_stats, instrument_queries, truncate_statement
+from app.config import get_settings
+from app.users.permissions import ROLE_ADMIN, has_role
+
+logger = logging.getLogger("phill.sql")
+
+
+class QueryStatsMiddleware:
+    """Count queries and DB time per request; admins get them back as ``Server-Timing: db``.
+
+    With ``detect_n_plus_one`` on, a statement repeated ``n_plus_one_threshold``
+    times within one request is logged as a likely N+1.
+    """
+
+    def __init__(self, app: ASGIApp, detect_n_plus_one: bool, n_plus_one_threshold: int) -> None:
+        self.app = app
+        self.detect_n_plus_one = detect_n_plus_one and n_plus_one_threshold > 0
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(track_shapes=self.detect_n_plus_one)
+        state = scope.setdefault("state", {})
+
+        async def send_wrapper(message: Message) -> None:
+            # The user is known once the route's dependencies ran, which is before the response starts.
+            if message["type"] == "http.response.start" and has_role(state.get("user_role"), ROLE_ADMIN):
+                timing = f'db;dur={stats.milliseconds};desc="{stats.count} queries"'
+                message.setdefault("headers", []).append((b"server-timing", timing.encode("latin-1")))
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            for statement, count in stats.repeated(self.n_plus_one_threshold):
+                logger.warning(
+                    "Possible N+1 in %s %s: statement ran %s times: %s",
+                    scope["method"],
+                    route_template(scope),
+                    count,
+                    truncate_statement(statement),
+                    extra={"route": route_template(scope), "repeats": count},
+                )
+
+
+def install_query_stats_middleware(app: FastAPI, engines: dict[str, Engine]) -> None:
+    settings = get_settings()
+    for target in engines.values():
+        instrument_queries(target, settings.sql_slow_query_ms / 1000)
+    app.add_middleware(
+        QueryStatsMiddleware,
+        detect_n_plus_one=settings.env == "development",
+        n_plus_one_threshold=settings.sql_n_plus_one_threshold,
+    )
@@ -1,34 +1,183 @@
-from collections import defaultdict
+import logging
+import threading
+from collections import OrderedDict
 from time import monotonic
+from typing import Protocol
 
-from fastapi import FastAPI, Request, Response, status
+from fastapi import FastAPI, Response, status
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.admin.prometheus import RATE_LIMIT_REJECTIONS
+from app.config import Settings, get_settings
+from app.middleware.rate_limit_policies import ClientIdentity, CompiledPolicy, compile_policies, match_policy
 
 WINDOW = 60
 LIMIT = 100
+MAX_TRACKED_KEYS = 100_000
+SWEEP_INTERVAL = 30
+
+logger = logging.getLogger("phill.rate_limit")
+
+
+class RateLimiter(Protocol):
+    def allow(self, key: str, cost: float = 1.0) -> bool: ...
+
+    def start_sweeper(self) -> None: ...
+
+    def stop_sweeper(self) -> None: ...
 
 
 class MemoryRateLimiter:
-    def __init__(self) -> None:
-        self.requests: dict[str, list[float]] = defaultdict(list)
+    """Token-bucket limiter with constant work per request and bounded memory.
+
+    Each key holds ``[tokens, last_seen]``; buckets refill at
+    ``limit / window`` tokens per second up to ``limit``. Keys are kept in
+    least-recently-used order so idle buckets (which would be full again
+    anyway) can be dropped from the front in O(evicted), and the oldest key
+    is evicted when ``max_keys`` is reached.
+    """
 
-    def allow(self, key: str) -> bool:
+    def __init__(
+        self,
+        limit: int = LIMIT,
+        window: float = WINDOW,
+        max_keys: int = MAX_TRACKED_KEYS,
+        sweep_interval: float = SWEEP_INTERVAL,
+    ) -> None:
+        self.capacity = float(limit)
+        self.window = float(window)
+        self.refill_rate = self.capacity / self.window
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self.buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def allow(self, key: str, cost: float = 1.0) -> bool:
         now = monotonic()
-        window_start = now - WINDOW
-        bucket = self.requests[key]
-        self.requests[key] = [ts for ts in bucket if ts >= window_start]
-        if len(self.requests[key]) >= LIMIT:
-            return False
-        self.requests[key].append(now)
-        return True
+        with self._lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_keys:
+                    self.buckets.popitem(last=False)
+                bucket = [self.capacity, now]
+                self.buckets[key] = bucket
+            else:
+                self.buckets.move_to_end(key)
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_rate)
+                bucket[1] = now
+
+            if bucket[0] < cost:
+                return False
+            bucket[0] -= cost
+            return True
+
+    def evict_idle(self, now: float | None = None, chunk: int = 1_000) -> int:
+        """Drop buckets untouched for a full window; they have refilled completely.
+
+        The lock is released every ``chunk`` evictions so a large sweep never
+        stalls request handling.
+        """
+
+        cutoff = (now if now is not None else monotonic()) - self.window
+        evicted = 0
+        while True:
+            with self._lock:
+                for _ in range(chunk):
+                    if not self.buckets:
+                        return evicted
+                    key, bucket = self.buckets.popitem(last=False)
+                    if bucket[1] > cutoff:
+                        self.buckets[key] = bucket
+                        self.buckets.move_to_end(key, last=False)
+                        return evicted
+                    evicted += 1
+
+    def start_sweeper(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sweep_loop, name="phill-rate-limit", daemon=True)
+        self._thread.start()
 
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
 
-limiter = MemoryRateLimiter()
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            evicted = self.evict_idle()
+            if evicted:
+                logger.debug("Evicted %s idle rate limit buckets", evicted)
+
+
+def create_limiter(settings: Settings, *, limit: int = LIMIT, window: float = WINDOW) -> RateLimiter:
+    """Build the limiter backend selected by ``RATE_LIMIT_BACKEND``.
+
+    ``memory`` limits per process; ``sqlite`` shares counters between the
+    workers on one host; ``redis`` shares them across hosts.
+    """
+
+    backend = (settings.rate_limit_backend or "memory").strip().lower()
+    if backend == "memory":
+        return MemoryRateLimiter(limit=limit, window=window)
+
+    from app.middleware.rate_limit_backends import RedisRateLimiter, SQLiteRateLimiter
+
+    if backend == "sqlite":
+        return SQLiteRateLimiter(
+            settings.rate_limit_sqlite_path, limit=limit, window=window, batch=settings.rate_limit_batch
+        )
+    if backend == "redis":
+        if not settings.rate_limit_redis_url:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is required for the redis rate limit backend")
+        return RedisRateLimiter(
+            settings.rate_limit_redis_url, limit=limit, window=window, batch=settings.rate_limit_batch
+        )
+    raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {settings.rate_limit_backend}")
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware applying the first matching rate limit policy."""
+
+    def __init__(self, app: ASGIApp, policies: list[CompiledPolicy], identity: ClientIdentity) -> None:
+        self.app = app
+        self.policies = policies
+        self.identity = identity
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        policy = match_policy(self.policies, scope["method"], scope["path"])
+        if policy is not None and policy.limiter is not None:
+            key = self.identity.bucket_key(policy, HTTPConnection(scope))
+            if not policy.limiter.allow(key, policy.cost):
+                RATE_LIMIT_REJECTIONS.labels(policy.name).inc()
+                response = Response(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(policy.retry_after), "X-RateLimit-Policy": policy.name},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
 
 
 def install_rate_limit_middleware(app: FastAPI) -> None:
-    @app.middleware("http")
-    async def rate_limit(request: Request, call_next):  # type: ignore[override]
-        client_ip = request.client.host if request.client else "anonymous"
-        if not limiter.allow(client_ip):
-            return Response(status_code=status.HTTP_429_TOO_MANY_REQUESTS)
-        return await call_next(request)
+    settings = get_settings()
+    identity = ClientIdentity(settings.rate_limit_trusted_proxies)
+    policies = compile_policies(
+        settings, lambda policy: create_limiter(settings, limit=policy.limit, window=policy.window)
+    )
+    for policy in policies:
+        if policy.limiter is not None:
+            app.add_event_handler("startup", policy.limiter.start_sweeper)
+            app.add_event_handler("shutdown", policy.limiter.stop_sweeper)
+
+    app.add_middleware(RateLimitMiddleware, policies=policies, identity=identity)
@@ -0,0 +1,233 @@
+"""Rate limiter backends that share counters across worker processes.
+
+Both backends use a sliding-window counter stored per ``(key, window)`` and
+hand out *leases*: a worker reserves a small batch of requests from the
+shared counter in one atomic update, then spends it locally. Most calls
+never leave the process, and the shared total can never exceed the limit
+because every lease is taken from it.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic, time
+
+from app.middleware.rate_limit import LIMIT, MAX_TRACKED_KEYS, SWEEP_INTERVAL, WINDOW
+
+logger = logging.getLogger("phill.rate_limit")
+
+DEFAULT_BATCH = 5
+
+
+class SharedRateLimiter(ABC):
+    """Lease-based limiter over an external counter store.
+
+    Subclasses implement :meth:`_reserve` (atomically add to the current
+    window and return the previous and updated counts), :meth:`_release`
+    (give back an over-reservation) and :meth:`_purge` (drop old windows).
+    """
+
+    def __init__(
+        self,
+        limit: int = LIMIT,
+        window: float = WINDOW,
+        batch: int = DEFAULT_BATCH,
+        max_keys: int = MAX_TRACKED_KEYS,
+        sweep_interval: float = SWEEP_INTERVAL,
+    ) -> None:
+        self.limit = limit
+        self.window = float(window)
+        self.batch = max(1, batch)
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        # key -> [tokens left in the lease, window id the lease belongs to]
+        self.leases: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_error = 0.0
+
+    def allow(self, key: str, cost: float = 1.0) -> bool:
+        now = time()
+        window_id = int(now // self.window)
+        with self._lock:
+            lease = self.leases.get(key)
+            if lease is not None and lease[1] == window_id and lease[0] >= cost:
+                lease[0] -= cost
+                self.leases.move_to_end(key)
+                return True
+
+        wanted = max(math.ceil(cost), self.batch)
+        try:
+            granted = self._acquire(key, window_id, wanted, now)
+        except Exception as exc:  # pragma: no cover - depends on the backing store
+            # Fail open: a broken limiter store must not take the API down with it.
+            if monotonic() - self._last_error > 60:
+                self._last_error = monotonic()
+                logger.warning("Rate limit backend unavailable, allowing requests: %s", exc)
+            return True
+
+        with self._lock:
+            lease = self.leases.get(key)
+            if lease is None or lease[1] != window_id:
+                if lease is None and len(self.leases) >= self.max_keys:
+                    self.leases.popitem(last=False)
+                lease = [0.0, window_id]
+                self.leases[key] = lease
+            lease[0] += granted
+            self.leases.move_to_end(key)
+            if lease[0] < cost:
+                return False
+            lease[0] -= cost
+            return True
+
+    def _acquire(self, key: str, window_id: int, wanted: int, now: float) -> int:
+        previous, current = self._reserve(key, window_id, wanted)
+        weight = 1.0 - (now % self.window) / self.window
+        used_before = previous * weight + (current - wanted)
+        granted = max(0, min(wanted, math.floor(self.limit - used_before)))
+        if granted < wanted:
+            self._release(key, window_id, wanted - granted)
+        return granted
+
+    @abstractmethod
+    def _reserve(self, key: str, window_id: int, amount: int) -> tuple[int, int]:
+        ...
+
+    @abstractmethod
+    def _release(self, key: str, window_id: int, amount: int) -> None:
+        ...
+
+    @abstractmethod
+    def _purge(self, before_window: int) -> None:
+        ...
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop expired leases locally and old windows from the shared store."""
+
+        window_id = int((now if now is not None else time()) // self.window)
+        evicted = 0
+        with self._lock:
+            # Leases are in least-recently-used order, so stale ones sit at the front.
+            while self.leases:
+                key, lease = self.leases.popitem(last=False)
+                if lease[1] >= window_id:
+                    self.leases[key] = lease
+                    self.leases.move_to_end(key, last=False)
+                    break
+                evicted += 1
+        try:
+            self._purge(window_id - 1)
+        except Exception as exc:  # pragma: no cover - depends on the backing store
+            logger.warning("Rate limit purge failed: %s", exc)
+        return evicted
+
+    def start_sweeper(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sweep_loop, name="phill-rate-limit", daemon=True)
+        self._thread.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            self.evict_idle()
+
+
+class SQLiteRateLimiter(SharedRateLimiter):
+    """Shares counters between workers on one host through a WAL-mode SQLite file."""
+
+    def __init__(self, path: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+            " key TEXT NOT NULL, window INTEGER NOT NULL, count INTEGER NOT NULL,"
+            " PRIMARY KEY (key, window)) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _reserve(self, key: str, window_id: int, amount: int) -> tuple[int, int]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = conn.execute(
+                "INSERT INTO rate_limit_counters (key, window, count) VALUES (?, ?, ?)"
+                " ON CONFLICT (key, window) DO UPDATE SET count = count + excluded.count"
+                " RETURNING count",
+                (key, window_id, amount),
+            ).fetchone()[0]
+            row = conn.execute(
+                "SELECT count FROM rate_limit_counters WHERE key = ? AND window = ?", (key, window_id - 1)
+            ).fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return (row[0] if row else 0), current
+
+    def _release(self, key: str, window_id: int, amount: int) -> None:
+        self._connection().execute(
+            "UPDATE rate_limit_counters SET count = count - ? WHERE key = ? AND window = ?",
+            (amount, key, window_id),
+        )
+
+    def _purge(self, before_window: int) -> None:
+        self._connection().execute("DELETE FROM rate_limit_counters WHERE window < ?", (before_window,))
+
+
+class RedisRateLimiter(SharedRateLimiter):
+    """Shares counters through any Redis-protocol server (Redis, Valkey, KeyDB...).
+
+    Each reservation is a single pipelined round trip (``INCRBY`` +
+    ``EXPIRE`` + ``GET`` of the previous window); keys expire on their own,
+    so there is nothing to purge server-side.
+    """
+
+    def __init__(self, url: str, *, prefix: str = "phill:rl", client=None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = int(self.window * 2) + 1
+
+    def _key(self, key: str, window_id: int) -> str:
+        return f"{self.prefix}:{key}:{window_id}"
+
+    def _reserve(self, key: str, window_id: int, amount: int) -> tuple[int, int]:
+        current_key = self._key(key, window_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.incrby(current_key, amount)
+        pipe.expire(current_key, self.ttl)
+        pipe.get(self._key(key, window_id - 1))
+        current, _, previous = pipe.execute()
+        return int(previous or 0), int(current)
+
+    def _release(self, key: str, window_id: int, amount: int) -> None:
+        self.client.decrby(self._key(key, window_id), amount)
+
+    def _purge(self, before_window: int) -> None:
+        return None
@@ -0,0 +1,160 @@
+"""Declarative rate limit policies keyed by route and caller identity."""
+
+from __future__ import annotations
+
+import ipaddress
+import math
+import re
+from dataclasses import dataclass
+from fnmatch import translate
+from functools import lru_cache
+from typing import Literal
+
+from jose import JWTError
+from pydantic import BaseModel, Field
+from starlette.requests import HTTPConnection
+
+from app.config import Settings
+from app.middleware.tenant import COMPANY_HEADER
+from app.security.tokens import TokenType, decode_token
+
+KeyType = Literal["ip", "user", "company"]
+
+DEFAULT_POLICIES: list[dict] = [
+    {"name": "health", "paths": ["/health", "/api/health", "/metrics"], "exempt": True},
+    {"name": "auth", "paths": ["/api/auth/*"], "methods": ["POST"], "key": "ip", "limit": 60, "window": 60},
+    {"name": "ai-chat", "paths": ["/api/ai/chat"], "methods": ["POST"], "key": "user", "limit": 20, "window": 60},
+    {
+        "name": "uploads",
+        "paths": ["/api/ai/documents", "/api/documents/upload"],
+        "methods": ["POST"],
+        "key": "company",
+        "limit": 30,
+        "window": 60,
+    },
+    {"name": "default", "paths": ["*"], "key": "user", "limit": 100, "window": 60},
+]
+
+
+class RateLimitPolicyConfig(BaseModel):
+    """One entry of ``RATE_LIMIT_POLICIES``; the first matching policy wins."""
+
+    name: str
+    paths: list[str] = Field(default_factory=lambda: ["*"])
+    methods: list[str] | None = None
+    key: KeyType = "user"
+    limit: int = Field(100, ge=1)
+    window: float = Field(60, gt=0)
+    cost: float = Field(1, gt=0)
+    exempt: bool = False
+
+
+@dataclass
+class CompiledPolicy:
+    name: str
+    pattern: re.Pattern[str]
+    methods: frozenset[str] | None
+    key: KeyType
+    limit: int
+    window: float
+    cost: float
+    exempt: bool
+    limiter: object | None = None
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.methods is None or method in self.methods) and self.pattern.match(path) is not None
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.cost * self.window / self.limit))
+
+
+def compile_policies(settings: Settings, limiter_factory) -> list[CompiledPolicy]:
+    """Validate the configured policies and build one limiter per policy.
+
+    Route globs (``/api/ai/*``) are folded into a single anchored regex per
+    policy so matching a request is one ``re.match`` per policy tried.
+    """
+
+    raw = settings.rate_limit_policies if settings.rate_limit_policies is not None else DEFAULT_POLICIES
+    compiled: list[CompiledPolicy] = []
+    for entry in raw:
+        config = RateLimitPolicyConfig.model_validate(entry)
+        pattern = re.compile("|".join(f"(?:{translate(path)})" for path in config.paths))
+        policy = CompiledPolicy(
+            name=config.name,
+            pattern=pattern,
+            methods=frozenset(method.upper() for method in config.methods) if config.methods else None,
+            key=config.key,
+            limit=config.limit,
+            window=config.window,
+            cost=config.cost,
+            exempt=config.exempt,
+        )
+        if not policy.exempt:
+            policy.limiter = limiter_factory(policy)
+        compiled.append(policy)
+    return compiled
+
+
+def match_policy(policies: list[CompiledPolicy], method: str, path: str) -> CompiledPolicy | None:
+    for policy in policies:
+        if policy.matches(method, path):
+            return policy
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _token_identity(token: str) -> tuple[str | None, str | None]:
+    """Return ``(user_id, company_id)`` from a signed access token.
+
+    Only used to pick a rate limit bucket, so caching past expiry is harmless;
+    forged tokens fail signature checks and fall back to the client IP.
+    """
+
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        return None, None
+    if payload.get("type") != TokenType.ACCESS:
+        return None, None
+    return payload.get("sub"), payload.get("company_id")
+
+
+class ClientIdentity:
+    """Resolve the caller's IP, user and company for bucket keys."""
+
+    def __init__(self, trusted_proxies: list[str]) -> None:
+        self.trusted = [ipaddress.ip_network(value, strict=False) for value in trusted_proxies]
+
+    def client_ip(self, conn: HTTPConnection) -> str:
+        host = conn.client.host if conn.client else "anonymous"
+        if self.trusted and self._is_trusted(host):
+            forwarded = conn.headers.get("x-real-ip") or conn.headers.get("x-forwarded-for", "").split(",")[-1]
+            if forwarded.strip():
+                return forwarded.strip()
+        return host
+
+    def _is_trusted(self, host: str) -> bool:
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted)
+
+    def bucket_key(self, policy: CompiledPolicy, conn: HTTPConnection) -> str:
+        if policy.key != "ip":
+            user_id, company_id = None, None
+            authorization = conn.headers.get("authorization", "")
+            if authorization[:7].lower() == "bearer ":
+                user_id, company_id = _token_identity(authorization[7:].strip())
+            if policy.key == "user" and user_id:
+                return f"{policy.name}:user:{user_id}"
+            if policy.key == "company":
+                # The header only picks the tenant for authenticated callers, so
+                # anonymous clients cannot dodge limits by rotating it.
+                if user_id and not company_id:
+                    company_id = conn.headers.get(COMPANY_HEADER)
+                if company_id:
+                    return f"{policy.name}:company:{company_id}"
+        return f"{policy.name}:ip:{self.client_ip(conn)}"
@@ -0,0 +1,43 @@
+from fastapi import FastAPI
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.replica import PRIMARY_COOKIE, replica_configured, write_pins
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """Keep a user's reads on the primary for a short while after each successful write.
+
+    The pin is held in this process for API clients and set as a cookie so a
+    browser's next request sees its own write on any worker.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_with_pin(message: Message) -> None:
+            user_id = state.get("user_id")
+            if message["type"] == "http.response.start" and message["status"] < 400 and user_id:
+                until = write_pins.pin(user_id)
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{PRIMARY_COOKIE}={until:.0f}; Max-Age={write_pins.seconds:.0f}; Path=/api; "
+                    "HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+
+def install_read_your_writes_middleware(app: FastAPI) -> None:
+    if replica_configured():
+        app.add_middleware(ReadYourWritesMiddleware)
@@ -1,9 +1,33 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import get_settings
 
 
+class SecurityHeadersMiddleware:
+    """Add default security headers to every response that lacks them."""
+
+    def __init__(self, app: ASGIApp, headers: dict[str, str]) -> None:
+        self.app = app
+        self.headers = list(headers.items())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self.headers:
+                    headers.setdefault(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
 def install_security_headers(app: FastAPI) -> None:
     settings = get_settings()
     csp_policy = settings.csp_directives or " ".join(
@@ -19,14 +43,15 @@ def install_security_headers(app: FastAPI) -> None:
         ]
     )
 
-    @app.middleware("http")
-    async def add_security_headers(request, call_next):  # type: ignore[override]
-        response = await call_next(request)
-        response.headers.setdefault("Content-Security-Policy", csp_policy)
-        response.headers.setdefault("Referrer-Policy", "no-referrer")
-        response.headers.setdefault("X-Content-Type-Options", "nosniff")
-        response.headers.setdefault("Permissions-Policy", "camera=(), microphone=(), geolocation=()")
-        return response
+    app.add_middleware(
+        SecurityHeadersMiddleware,
+        headers={
+            "Content-Security-Policy": csp_policy,
+            "Referrer-Policy": "no-referrer",
+            "X-Content-Type-Options": "nosniff",
+            "Permissions-Policy": "camera=(), microphone=(), geolocation=()",
+        },
+    )
 
     origins = settings.cors_origins or [settings.frontend_url]
     app.add_middleware(
@@ -35,4 +60,6 @@ def install_security_headers(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Let cross-origin clients read the conditional-request and pagination headers.
+        expose_headers=["ETag", "Link", "X-Next-Cursor"],
     )
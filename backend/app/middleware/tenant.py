@@ -1,10 +1,27 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 COMPANY_HEADER = "X-Company-ID"
 
 
+class TenantMiddleware:
+    """Expose the requested tenant as ``request.state.company_id``.
+
+    Only the header is read here. ``get_current_tenant`` looks the company up
+    once the caller is authenticated and has passed the rate limiter, and
+    checks that they may act in it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            company_id = (Headers(scope=scope).get(COMPANY_HEADER) or "").strip()
+            scope.setdefault("state", {})["company_id"] = company_id or None
+        await self.app(scope, receive, send)
+
+
 def install_tenant_middleware(app: FastAPI) -> None:
-    @app.middleware("http")
-    async def add_tenant_context(request: Request, call_next):  # type: ignore[override]
-        request.state.company_id = request.headers.get(COMPANY_HEADER)
-        return await call_next(request)
+    app.add_middleware(TenantMiddleware)
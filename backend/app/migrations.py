@@ -0,0 +1,273 @@
+"""Versioned schema migrations applied on top of ``SQLModel.metadata.create_all``.
+
+``create_all`` creates missing tables with their declared indexes but never
+changes a table that already exists. Columns and indexes added later ship as
+numbered migrations below; each runs once per database and is recorded in
+``schema_migrations``.
+
+Migrations run in autocommit mode so Postgres can build indexes with
+``CREATE INDEX CONCURRENTLY``, which leaves hot tables writable during the
+build. A migration interrupted halfway is retried from the start, so every
+step must be idempotent (``IF NOT EXISTS``, ``add_column``). A Postgres
+advisory lock keeps workers starting together from running them twice.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from time import perf_counter
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Column, DateTime, Field, SQLModel, select
+
+# Every table module, so create_all knows the full schema even outside the app (scripts).
+import app.ai.tables  # noqa: F401
+import app.communication.models  # noqa: F401
+import app.companies.models  # noqa: F401
+import app.documents.models  # noqa: F401
+import app.incidents.models  # noqa: F401
+import app.tickets.models  # noqa: F401
+import app.users.models  # noqa: F401
+import app.utils.etag  # noqa: F401
+from app.db import engine, wait_for_database
+
+logger = logging.getLogger("phill.db")
+
+# Arbitrary constant shared by every worker; pg_advisory_lock serializes migration runs on it.
+MIGRATION_LOCK_ID = 0x5048494C
+
+
+class SchemaMigration(SQLModel, table=True):
+    __tablename__ = "schema_migrations"
+
+    version: int = Field(primary_key=True)
+    name: str
+    applied_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True)))
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, name: str) -> Callable[[Callable[[Connection], None]], Callable[[Connection], None]]:
+    def register(apply: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} must come after {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, name, apply))
+        return apply
+
+    return register
+
+
+def create_index(
+    connection: Connection,
+    name: str,
+    table: str,
+    columns: str,
+    *,
+    unique: bool = False,
+    where: str | None = None,
+    using: str | None = None,
+) -> None:
+    """Create an index unless it exists, without blocking writes on Postgres."""
+
+    unique_sql = "UNIQUE " if unique else ""
+    where_sql = f" WHERE {where}" if where else ""
+    table = f"{table} USING {using}" if using else table
+    if connection.dialect.name == "postgresql":
+        # A failed concurrent build leaves an invalid index behind that IF NOT EXISTS would keep.
+        invalid = connection.execute(
+            text(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        ).first()
+        if invalid:
+            connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        connection.exec_driver_sql(
+            f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns}){where_sql}"
+        )
+    else:
+        connection.exec_driver_sql(f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({columns}){where_sql}")
+
+
+def add_column(connection: Connection, table: str, column: str, definition: str) -> None:
+    if column not in {existing["name"] for existing in inspect(connection).get_columns(table)}:
+        connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+@migration(1, "users token epoch and case-insensitive email index")
+def _users_token_epoch(connection: Connection) -> None:
+    add_column(connection, "users", "token_epoch", "INTEGER NOT NULL DEFAULT 0")
+    # Accounts created before emails were normalized can differ only in case; the unique index can't be built
+    # over them, so name them instead of failing on a bare constraint error.
+    clashing = connection.execute(
+        text(
+            "SELECT email FROM users WHERE lower(email) IN "
+            "(SELECT lower(email) FROM users GROUP BY lower(email) HAVING count(*) > 1) "
+            "ORDER BY lower(email), email"
+        )
+    ).scalars().all()
+    if clashing:
+        raise RuntimeError(
+            "Cannot create the case-insensitive unique email index: these accounts share an email that differs "
+            f"only in case: {', '.join(clashing)}. Change or remove the duplicates, then restart to retry."
+        )
+    create_index(connection, "ix_users_email_lower", "users", "lower(email)", unique=True)
+
+
+@migration(2, "retention sweep indexes")
+def _retention_indexes(connection: Connection) -> None:
+    create_index(connection, "ix_password_reset_tokens_hash_expires", "password_reset_tokens", "token_hash, expires_at")
+    create_index(connection, "ix_password_reset_tokens_expires_at", "password_reset_tokens", "expires_at")
+    create_index(connection, "ix_refresh_tokens_expires_at", "refresh_tokens", "expires_at")
+    create_index(connection, "ix_password_reset_requests_created_at", "password_reset_requests", "created_at")
+    create_index(connection, "ix_access_requests_created_at", "access_requests", "created_at")
+
+
+@migration(3, "list pagination indexes")
+def _list_indexes(connection: Connection) -> None:
+    for table in ("tickets", "incidents"):
+        create_index(connection, f"ix_{table}_company_created", table, "company_id, created_at, id")
+        create_index(connection, f"ix_{table}_company_user_created", table, "company_id, user_id, created_at, id")
+        create_index(connection, f"ix_{table}_company_status_created", table, "company_id, status, created_at, id")
+    create_index(connection, "ix_users_company_created", "users", "company_id, created_at, id")
+    create_index(connection, "ix_documents_company_created", "documents", "company_id, created_at, id")
+
+
+@migration(4, "AI document listing index")
+def _ai_document_index(connection: Connection) -> None:
+    # Only document rows are listed; chat memories share the table and would otherwise be scanned too.
+    # The predicate mirrors what ``AiMemory.data["type"].as_string() == "document"`` compiles to. SQLite
+    # only uses a partial index when the query repeats its WHERE term exactly, so keep the path quoting.
+    if connection.dialect.name == "postgresql":
+        is_document = "CAST((data ->> 'type') AS VARCHAR) = 'document'"
+    else:
+        is_document = """JSON_EXTRACT(ai_memory.data, '$."type"') = 'document'"""
+    create_index(connection, "ix_ai_memory_documents", "ai_memory", "created_at", where=is_document)
+
+
+# Searchable text per table, most important column first (weight A, then B).
+_SEARCH_COLUMNS = {
+    "tickets": ("subject", "message"),
+    "incidents": ("type", "description"),
+    "documents": ("name",),
+}
+_BACKFILL_BATCH = 1000
+
+
+def _search_vector(columns: tuple[str, ...], prefix: str = "") -> str:
+    return " || ".join(
+        f"setweight(to_tsvector('english', coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in zip(columns, "AB")
+    )
+
+
+@migration(5, "full-text search")
+def _full_text_search(connection: Connection) -> None:
+    # Postgres: a trigger-maintained tsvector column with a GIN index. The column is added empty and
+    # backfilled in batches, so no step holds a long lock on the table (a generated column would
+    # rewrite it under an exclusive lock). SQLite: an FTS5 table per searchable table, kept in step
+    # by triggers, for local and test runs.
+    for table, columns in _SEARCH_COLUMNS.items():
+        if connection.dialect.name == "postgresql":
+            add_column(connection, table, "search_vector", "tsvector")
+            connection.exec_driver_sql(
+                f"CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$ "
+                f"BEGIN NEW.search_vector := {_search_vector(columns, 'NEW.')}; RETURN NEW; END $$"
+            )
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {table}_search_vector ON {table}")
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE OF {', '.join(columns)} ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()"
+            )
+            backfill = (
+                f"UPDATE {table} SET search_vector = {_search_vector(columns)} "
+                f"WHERE id IN (SELECT id FROM {table} WHERE search_vector IS NULL LIMIT {_BACKFILL_BATCH})"
+            )
+            while connection.exec_driver_sql(backfill).rowcount:
+                pass
+            create_index(connection, f"ix_{table}_search", table, "search_vector", using="gin")
+        else:
+            names = ", ".join(columns)
+            values = ", ".join(f"new.{column}" for column in columns)
+            connection.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(id UNINDEXED, {names})"
+            )
+            insert = f"INSERT INTO {table}_fts (id, {names}) VALUES (new.id, {values});"
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END"
+            )
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {names} ON {table} "
+                f"BEGIN DELETE FROM {table}_fts WHERE id = old.id; {insert} END"
+            )
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} "
+                f"BEGIN DELETE FROM {table}_fts WHERE id = old.id; END"
+            )
+            connection.exec_driver_sql(f"DELETE FROM {table}_fts")
+            connection.exec_driver_sql(f"INSERT INTO {table}_fts (id, {names}) SELECT id, {names} FROM {table}")
+
+
+@migration(6, "cross-company list indexes")
+def _cross_company_list_indexes(connection: Connection) -> None:
+    # Founders list users and documents without a company filter.
+    create_index(connection, "ix_users_created", "users", "created_at, id")
+    create_index(connection, "ix_documents_created", "documents", "created_at, id")
+
+
+@contextmanager
+def _migration_lock(connection: Connection) -> Iterator[None]:
+    if connection.dialect.name != "postgresql":
+        yield
+        return
+    connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    try:
+        yield
+    finally:
+        connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+
+def applied_versions(connection: Connection) -> set[int]:
+    return set(connection.execute(select(SchemaMigration.version)).scalars())
+
+
+def migrate(target: Engine | None = None) -> list[int]:
+    """Create missing tables, then apply pending migrations in order; returns the versions applied."""
+
+    target = target or engine
+    applied: list[int] = []
+    with target.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        with _migration_lock(connection):
+            SQLModel.metadata.create_all(connection)
+            done = applied_versions(connection)
+            for step in MIGRATIONS:
+                if step.version in done:
+                    continue
+                started = perf_counter()
+                step.apply(connection)
+                connection.execute(SchemaMigration.__table__.insert().values(version=step.version, name=step.name))
+                applied.append(step.version)
+                logger.info("Applied migration %04d %s in %.2fs", step.version, step.name, perf_counter() - started)
+    return applied
+
+
+def migrate_database() -> list[int]:
+    """Wait for the database to accept connections, then ``migrate``."""
+
+    wait_for_database()
+    return migrate()
@@ -0,0 +1,239 @@
+"""Optional read replica for list and detail endpoints.
+
+With ``DATABASE_READ_URL`` set, ``get_read_session`` and
+``get_async_read_session`` open sessions on the replica. They hand out a
+primary session instead while the replica is unreachable or lags more than
+``READ_REPLICA_MAX_LAG_SECONDS``, and for a user who wrote something in the
+last ``READ_REPLICA_PIN_SECONDS`` so they always read their own changes.
+Without a replica both are plain primary sessions.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Generator
+from datetime import datetime, timezone
+from time import monotonic, time
+
+from fastapi import Depends, Request
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import get_settings
+from app.db import (
+    TimedAsyncReadQueuePool,
+    TimedReadQueuePool,
+    async_database_url,
+    async_engine,
+    build_async_engine,
+    build_engine,
+    engine,
+    engine_pool_status,
+)
+from app.security.dependencies import get_current_active_user, get_current_active_user_async
+from app.users.models import User
+
+logger = logging.getLogger("phill.db")
+
+# Set on responses to writes; carries the unix time until which the browser's reads stay on the primary.
+PRIMARY_COOKIE = "phill_primary_until"
+
+_POSTGRES_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaHealth:
+    """Last measured replica lag, refreshed by at most one request every ``interval`` seconds."""
+
+    def __init__(self, max_lag: float, interval: float) -> None:
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag: float | None = None
+        self.error: str | None = None
+        self.checked_at: datetime | None = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def usable(self) -> bool:
+        return self.error is None and self.lag is not None and self.lag <= self.max_lag
+
+    def claim_check(self) -> bool:
+        """True for the one caller that should measure the lag now."""
+
+        with self._lock:
+            now = monotonic()
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.interval
+            return True
+
+    def record(self, lag: float | None, error: str | None = None) -> None:
+        was_usable = self.usable
+        self.lag, self.error = lag, error
+        self.checked_at = datetime.now(timezone.utc)
+        if was_usable and not self.usable:
+            logger.warning("Read replica unusable, reading from the primary: %s", error or f"lag {lag:.1f}s")
+        elif self.usable and not was_usable:
+            logger.info("Read replica back in use (lag %.1fs)", lag)
+
+    def mark_down(self, error: str) -> None:
+        with self._lock:
+            self._next_check = monotonic() + self.interval
+        self.record(None, error)
+
+    def status(self) -> dict[str, object]:
+        return {
+            "in_use": self.usable,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "error": self.error,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+        }
+
+
+class WritePins:
+    """Users who wrote recently in this process; their reads go to the primary until the pin expires."""
+
+    def __init__(self, seconds: float, max_entries: int = 10_000) -> None:
+        self.seconds = seconds
+        self.max_entries = max_entries
+        self._pins: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pin(self, user_id: str) -> float:
+        """Pin ``user_id`` and return the unix time the pin ends."""
+
+        with self._lock:
+            self._pins[user_id] = monotonic() + self.seconds
+            self._pins.move_to_end(user_id)
+            while len(self._pins) > self.max_entries:
+                self._pins.popitem(last=False)
+        return time() + self.seconds
+
+    def pinned(self, user_id: str) -> bool:
+        with self._lock:
+            expires = self._pins.get(user_id)
+            if expires is None:
+                return False
+            if expires < monotonic():
+                del self._pins[user_id]
+                return False
+            return True
+
+
+settings = get_settings()
+health = ReplicaHealth(settings.read_replica_max_lag_seconds, settings.read_replica_check_seconds)
+write_pins = WritePins(settings.read_replica_pin_seconds)
+
+read_engine: Engine | None = None
+async_read_engine = None
+if settings.database_read_url:
+    read_engine = build_engine(settings.database_read_url, settings, TimedReadQueuePool)
+    async_read_engine = build_async_engine(
+        settings.database_async_read_url or async_database_url(settings.database_read_url),
+        settings,
+        TimedAsyncReadQueuePool,
+    )
+
+    def _on_error(context) -> None:
+        if context.is_disconnect:
+            health.mark_down(str(context.original_exception))
+
+    for _target in (read_engine, async_read_engine.sync_engine):
+        event.listen(_target, "handle_error", _on_error)
+
+
+def replica_configured() -> bool:
+    return read_engine is not None
+
+
+def read_engines() -> dict[str, Engine]:
+    """The replica's sync engines by pool name, for instrumentation; empty without a replica."""
+
+    if read_engine is None:
+        return {}
+    return {"read_sync": read_engine, "read_async": async_read_engine.sync_engine}
+
+
+def _measure_lag(connection: Connection) -> float:
+    statement = _POSTGRES_LAG if connection.dialect.name == "postgresql" else text("SELECT 0")
+    return float(connection.execute(statement).scalar() or 0)
+
+
+def check_replica() -> None:
+    if read_engine is None or not health.claim_check():
+        return
+    try:
+        with read_engine.connect() as connection:
+            lag = _measure_lag(connection)
+    except Exception as exc:  # pragma: no cover - environment dependent
+        health.mark_down(str(exc))
+    else:
+        health.record(lag)
+
+
+async def check_replica_async() -> None:
+    if async_read_engine is None or not health.claim_check():
+        return
+    try:
+        async with async_read_engine.connect() as connection:
+            lag = await connection.run_sync(_measure_lag)
+    except Exception as exc:  # pragma: no cover - environment dependent
+        health.mark_down(str(exc))
+    else:
+        health.record(lag)
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    user_id = getattr(request.state, "user_id", None)
+    if user_id and write_pins.pinned(user_id):
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE) or 0) > time()
+    except ValueError:
+        return False
+
+
+def _use_replica(request: Request) -> bool:
+    return health.usable and not _pinned_to_primary(request)
+
+
+def get_read_session(
+    request: Request, _user: User = Depends(get_current_active_user)
+) -> Generator[Session, None, None]:
+    """Session for read-only routes: the replica when it is current enough for this user, else the primary.
+
+    Depends on the user so the write pin can be checked; routes using it
+    must not write.
+    """
+
+    check_replica()
+    with Session(read_engine if _use_replica(request) else engine) as session:
+        yield session
+
+
+async def get_async_read_session(
+    request: Request, _user: User = Depends(get_current_active_user_async)
+) -> AsyncGenerator[AsyncSession, None]:
+    await check_replica_async()
+    target = async_read_engine if _use_replica(request) else async_engine
+    async with AsyncSession(target, expire_on_commit=False) as session:
+        yield session
+
+
+def replica_status() -> dict[str, object] | None:
+    if read_engine is None:
+        return None
+    return {
+        **health.status(),
+        "pin_seconds": write_pins.seconds,
+        "sync": engine_pool_status(read_engine),
+        "async": engine_pool_status(async_read_engine.sync_engine),
+    }
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.companies.cache import Tenant
+from app.replica import get_async_read_session
+from app.search.schemas import SearchHit
+from app.search.service import SEARCH_KINDS, search
+from app.security.dependencies import get_current_active_user_async, get_current_tenant_async
+from app.users.models import User
+from app.users.permissions import ROLE_SUPERVISOR, has_role
+from app.utils.pagination import OffsetPage, offset_page_params, offset_page_rows
+
+router = APIRouter()
+
+EXCERPT_CHARS = 200
+
+
+def _excerpt(body: str | None) -> str:
+    body = " ".join((body or "").split())
+    return body if len(body) <= EXCERPT_CHARS else body[:EXCERPT_CHARS].rsplit(" ", 1)[0] + "..."
+
+
+@router.get("/", response_model=list[SearchHit])
+async def search_records(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: list[str] | None = Query(default=None),
+    page: OffsetPage = Depends(offset_page_params),
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: User = Depends(get_current_active_user_async),
+    tenant: Tenant = Depends(get_current_tenant_async),
+) -> list[SearchHit]:
+    """Search ticket subjects and messages, incident types and descriptions, and document names."""
+
+    kinds = tuple(dict.fromkeys(kind)) if kind else SEARCH_KINDS
+    if unknown := [value for value in kinds if value not in SEARCH_KINDS]:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown kind: {', '.join(unknown)}")
+    if not q.split():
+        return []
+
+    # Same visibility as the lists: only supervisors see other users' tickets and incidents.
+    owner = None if has_role(current_user.role, ROLE_SUPERVISOR) else current_user.id
+    rows = await search(session, q, company_id=tenant.id, owner=owner, kinds=kinds, page=page)
+    return [
+        SearchHit(
+            kind=row.kind,
+            id=row.id,
+            title=row.title,
+            excerpt=_excerpt(row.body),
+            status=row.status,
+            created_at=row.created_at,
+            rank=row.rank,
+        )
+        for row in offset_page_rows(request, response, rows, page)
+    ]
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    kind: str
+    id: str
+    title: str
+    excerpt: str
+    status: str | None = None
+    created_at: datetime
+    rank: float
@@ -0,0 +1,85 @@
+"""Full-text search over tickets, incidents and documents.
+
+Postgres matches ``websearch_to_tsquery`` against each table's
+``search_vector`` (GIN-indexed, see migration 5) and ranks with
+``ts_rank``; SQLite matches the ``*_fts`` FTS5 tables and ranks with
+``bm25``. The company (and, for non-supervisors, owner) filter is part of
+each table's match query, so other tenants' rows never leave the database.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import DateTime, Float, text
+from sqlalchemy.engine import Row
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.utils.pagination import OffsetPage
+
+SEARCH_KINDS = ("ticket", "incident", "document")
+
+# kind -> (table, title column, body column or None, status column or None, has an owner)
+_TABLES = {
+    "ticket": ("tickets", "subject", "message", "status", True),
+    "incident": ("incidents", "type", "description", "status", True),
+    "document": ("documents", "name", None, None, False),
+}
+
+
+def _postgres_match(kind: str, owner: str | None) -> str:
+    table, title, body, status, owned = _TABLES[kind]
+    return (
+        f"SELECT '{kind}' AS kind, id, {title} AS title, {body or 'NULL'} AS body, {status or 'NULL'} AS status, "
+        f"created_at, ts_rank(search_vector, query) AS rank "
+        f"FROM {table}, websearch_to_tsquery('english', :terms) AS query "
+        f"WHERE company_id = :company_id AND search_vector @@ query"
+        + (" AND user_id = :owner" if owned and owner else "")
+    )
+
+
+def _sqlite_match(kind: str, owner: str | None) -> str:
+    table, title, body, status, owned = _TABLES[kind]
+    # bm25 is lower for better matches; the title column counts double, like weight A on Postgres.
+    weights = "0.0, 2.0, 1.0" if body else "0.0, 2.0"
+    return (
+        f"SELECT '{kind}' AS kind, t.id, t.{title} AS title, {'t.' + body if body else 'NULL'} AS body, "
+        f"{'t.' + status if status else 'NULL'} AS status, t.created_at, -bm25({table}_fts, {weights}) AS rank "
+        f"FROM {table}_fts JOIN {table} AS t ON t.id = {table}_fts.id "
+        f"WHERE {table}_fts MATCH :terms AND t.company_id = :company_id"
+        + (" AND t.user_id = :owner" if owned and owner else "")
+    )
+
+
+def _fts5_terms(terms: str) -> str:
+    # Quote every word so user input is never parsed as FTS5 syntax; the words are ANDed.
+    return " ".join('"' + word.replace('"', '""') + '"' for word in terms.split())
+
+
+async def search(
+    session: AsyncSession,
+    terms: str,
+    *,
+    company_id: str,
+    owner: str | None,
+    kinds: tuple[str, ...] = SEARCH_KINDS,
+    page: OffsetPage,
+) -> list[Row]:
+    """Best matches first (``rank`` desc, then newest); fetches ``page.limit + 1`` rows to detect a next page."""
+
+    postgres = session.bind.dialect.name == "postgresql"
+    match = _postgres_match if postgres else _sqlite_match
+    union = " UNION ALL ".join(match(kind, owner) for kind in kinds)
+    statement = text(
+        f"SELECT kind, id, title, body, status, created_at, rank FROM ({union}) AS hits "
+        "ORDER BY rank DESC, created_at DESC, id LIMIT :limit OFFSET :offset"
+    ).columns(created_at=DateTime(timezone=True), rank=Float)
+    result = await session.execute(
+        statement,
+        {
+            "terms": terms if postgres else _fts5_terms(terms),
+            "company_id": company_id,
+            "owner": owner,
+            "limit": page.limit + 1,
+            "offset": page.offset,
+        },
+    )
+    return list(result.all())
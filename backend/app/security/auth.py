@@ -6,15 +6,19 @@ import secrets
 
 from fastapi import APIRouter, Body, Depends, Form, HTTPException, Request, status
 from pydantic import BaseModel, EmailStr, Field, ValidationError
-from sqlalchemy import or_
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
-from app.db import get_session
+from app.db import get_async_session
 from app.communication.email import send_plain_email, smtp_configured
+from app.security.dependencies import get_current_active_user_async
 from app.security.password import hash_password, verify_password
-from app.security.tokens import TokenType, create_access_token, create_refresh_token, decode_token
+from app.security.refresh import issue_refresh_token, revoke_family, revoke_user_tokens, rotate_refresh_token
+from app.security.tokens import TokenType, create_access_token, decode_token
 from app.users.models import AccessRequest, PasswordResetRequest, PasswordResetToken, User
+from app.users.service import get_user_by_identifier
 from app.utils.email import normalize_email
 
 router = APIRouter()
@@ -54,13 +58,22 @@ def _normalize_identifier(identifier: str) -> str:
     return normalized
 
 
-def _authenticate(identifier: str, password: str, session: Session) -> User:
-    normalized_identifier = _normalize_identifier(identifier)
-    user = session.exec(
-        select(User)
-        .where(or_(User.username == normalized_identifier, User.email == normalized_identifier))
-    ).first()
-    if not user or not verify_password(password, user.password_hash) or user.disabled:
+def _access_token_for(user: User) -> str:
+    return create_access_token(
+        user.id,
+        role=user.role,
+        company_id=user.company_id,
+        email=user.email,
+        name=user.name,
+        username=user.username,
+        epoch=user.token_epoch,
+    )
+
+
+async def _authenticate(identifier: str, password: str, session: AsyncSession) -> User:
+    user = await session.run_sync(get_user_by_identifier, identifier)
+    # Argon2 deliberately burns CPU; verify off the event loop.
+    if not user or not await run_in_threadpool(verify_password, password, user.password_hash) or user.disabled:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
     return user
 
@@ -68,7 +81,7 @@ def _authenticate(identifier: str, password: str, session: Session) -> User:
 @router.post("/token")
 async def login_for_access_token(
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     username: str | None = Form(None),
     password: str | None = Form(None),
 ) -> dict[str, str]:
@@ -95,42 +108,34 @@ async def login_for_access_token(
             detail="username/email and password are required",
         )
 
-    user = _authenticate(identifier, secret, session)
+    user = await _authenticate(identifier, secret, session)
+    refresh_token = await session.run_sync(issue_refresh_token, user)
+    await session.commit()
 
     return {
-        "access_token": create_access_token(
-            user.id,
-            role=user.role,
-            company_id=user.company_id,
-            email=user.email,
-            name=user.name,
-            username=user.username,
-        ),
-        "refresh_token": create_refresh_token(user.id),
+        "access_token": _access_token_for(user),
+        "refresh_token": refresh_token,
         "token_type": "bearer",
     }
 
 
 @router.post("/login")
-def login_with_email(payload: EmailLoginPayload, session: Session = Depends(get_session)) -> dict[str, str]:
-    user = _authenticate(payload.email, payload.password, session)
+async def login_with_email(
+    payload: EmailLoginPayload, session: AsyncSession = Depends(get_async_session)
+) -> dict[str, str]:
+    user = await _authenticate(payload.email, payload.password, session)
+    refresh_token = await session.run_sync(issue_refresh_token, user)
+    await session.commit()
     return {
-        "access_token": create_access_token(
-            user.id,
-            role=user.role,
-            company_id=user.company_id,
-            email=user.email,
-            name=user.name,
-            username=user.username,
-        ),
-        "refresh_token": create_refresh_token(user.id),
+        "access_token": _access_token_for(user),
+        "refresh_token": refresh_token,
         "token_type": "bearer",
     }
 
 
 @router.post("/refresh")
-def refresh_access_token(
-    refresh_token: str = Body(embed=True), session: Session = Depends(get_session)
+async def refresh_access_token(
+    refresh_token: str = Body(embed=True), session: AsyncSession = Depends(get_async_session)
 ) -> dict[str, str]:
     try:
         payload = decode_token(refresh_token)
@@ -140,32 +145,47 @@ def refresh_access_token(
     if payload.get("type") != TokenType.REFRESH:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
 
-    subject = payload.get("sub")
-    if not subject:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject")
-
-    user = session.exec(select(User).where(User.id == subject)).first()
-    if not user or user.disabled:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    user, rotated = await session.run_sync(rotate_refresh_token, payload)
 
     return {
-        "access_token": create_access_token(
-            user.id,
-            role=user.role,
-            company_id=user.company_id,
-            email=user.email,
-            name=user.name,
-            username=user.username,
-        ),
+        "access_token": _access_token_for(user),
+        "refresh_token": rotated,
         "token_type": "bearer",
     }
 
 
+@router.post("/logout")
+async def logout(
+    refresh_token: str = Body(embed=True), session: AsyncSession = Depends(get_async_session)
+) -> dict[str, str]:
+    try:
+        payload = decode_token(refresh_token)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+    if payload.get("type") != TokenType.REFRESH:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
+
+    family_id = payload.get("fam")
+    if family_id:
+        await session.run_sync(revoke_family, family_id)
+    return {"status": "logged_out"}
+
+
+@router.post("/logout-all")
+async def logout_everywhere(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user_async),
+) -> dict[str, str]:
+    await session.run_sync(revoke_user_tokens, current_user)
+    return {"status": "logged_out"}
+
+
 @router.post("/request-reset", status_code=status.HTTP_202_ACCEPTED)
 async def request_password_reset(
     payload: PasswordResetRequestPayload,
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> dict[str, str]:
     normalized_email = _normalize_identifier(payload.email)
     record = PasswordResetRequest(
@@ -176,7 +196,7 @@ async def request_password_reset(
     )
     session.add(record)
 
-    user = session.exec(select(User).where(User.email == normalized_email)).first()
+    user = (await session.exec(select(User).where(User.email == normalized_email))).first()
     debug_token: str | None = None
     email_status = "skipped"
     if user:
@@ -209,7 +229,7 @@ async def request_password_reset(
         else:
             email_status = "smtp_unconfigured"
 
-    session.commit()
+    await session.commit()
     response: dict[str, str] = {"status": "accepted", "email_status": email_status}
     if debug_token:
         response["debug_token"] = debug_token
@@ -220,7 +240,7 @@ async def request_password_reset(
 async def request_access(
     payload: AccessRequestPayload,
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> dict[str, str]:
     normalized_email = _normalize_identifier(payload.email)
     record = AccessRequest(
@@ -231,7 +251,7 @@ async def request_access(
         created_at=datetime.utcnow(),
     )
     session.add(record)
-    session.commit()
+    await session.commit()
 
     email_status = "skipped"
     if smtp_configured():
@@ -261,28 +281,30 @@ async def request_access(
 
 
 @router.post("/confirm-reset")
-def confirm_password_reset(
-    payload: ConfirmResetPayload, session: Session = Depends(get_session)
+async def confirm_password_reset(
+    payload: ConfirmResetPayload, session: AsyncSession = Depends(get_async_session)
 ) -> dict[str, str]:
     token_hash = hashlib.sha256(payload.token.encode()).hexdigest()
     now = datetime.now(timezone.utc)
-    token = session.exec(
-        select(PasswordResetToken)
-        .where(PasswordResetToken.token_hash == token_hash)
-        .where(PasswordResetToken.used_at.is_(None))
-        .where(PasswordResetToken.expires_at >= now)
+    token = (
+        await session.exec(
+            select(PasswordResetToken)
+            .where(PasswordResetToken.token_hash == token_hash)
+            .where(PasswordResetToken.used_at.is_(None))
+            .where(PasswordResetToken.expires_at >= now)
+        )
     ).first()
 
     if not token:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token")
 
-    user = session.exec(select(User).where(User.id == token.user_id)).first()
+    user = (await session.exec(select(User).where(User.id == token.user_id))).first()
     if not user or user.disabled:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token")
 
-    user.password_hash = hash_password(payload.new_password)
+    user.password_hash = await run_in_threadpool(hash_password, payload.new_password)
     token.used_at = now
-    session.add(user)
     session.add(token)
-    session.commit()
+    # A reset implies the old credentials may be compromised: end every session.
+    await session.run_sync(revoke_user_tokens, user)
     return {"status": "reset"}
@@ -1,17 +1,21 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.companies.cache import Tenant, tenant_cache
+from app.db import get_async_session, get_session
 from app.security.tokens import TokenType, decode_token
 from app.users.models import User
-from app.users.permissions import has_role
+from app.users.permissions import ROLE_FOUNDER, has_role
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+def user_from_token(token: str, session: Session) -> User:
+    """Validate an access token and load its user, raising 401 otherwise."""
+
     try:
         payload = decode_token(token)
     except JWTError:
@@ -27,6 +31,23 @@ def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Dep
     user = session.exec(select(User).where(User.id == subject)).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if payload.get("epoch", 0) != user.token_epoch:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return user
+
+
+def _remember_user(request: Request, user: User) -> None:
+    # Picked up by the request log and Server-Timing once the response is sent.
+    request.state.user_id = str(user.id)
+    request.state.user_company_id = user.company_id
+    request.state.user_role = user.role
+
+
+def get_current_user(
+    request: Request, token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)
+) -> User:
+    user = user_from_token(token, session)
+    _remember_user(request, user)
     return user
 
 
@@ -36,6 +57,58 @@ def get_current_active_user(user: User = Depends(get_current_user)) -> User:
     return user
 
 
+def _resolve_tenant(session: Session, request: Request, user: User) -> Tenant:
+    tenant: Tenant | None = getattr(request.state, "tenant", None)
+    if tenant is not None:
+        return tenant
+
+    requested = getattr(request.state, "company_id", None)
+    company_id = requested or user.company_id
+    # Checked before the lookup so only founders can make us query for arbitrary ids.
+    if company_id != user.company_id and not has_role(user.role, ROLE_FOUNDER):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot act on another company")
+
+    tenant = tenant_cache.get(session, company_id) if company_id else None
+    if tenant is None:
+        detail = "Unknown company" if requested else "User is not linked to a company"
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+    request.state.tenant = tenant
+    return tenant
+
+
+def get_current_tenant(
+    request: Request,
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_active_user),
+) -> Tenant:
+    """The company this request acts in: the one named by ``X-Company-ID``, else the user's own."""
+
+    return _resolve_tenant(session, request, user)
+
+
+# Async counterparts for ``async def`` routes on ``get_async_session``; they share its session.
+
+
+async def get_current_user_async(
+    request: Request, token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)
+) -> User:
+    user = await session.run_sync(lambda sync_session: user_from_token(token, sync_session))
+    _remember_user(request, user)
+    return user
+
+
+async def get_current_active_user_async(user: User = Depends(get_current_user_async)) -> User:
+    return get_current_active_user(user)
+
+
+async def get_current_tenant_async(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_active_user_async),
+) -> Tenant:
+    return await session.run_sync(_resolve_tenant, request, user)
+
+
 def require_role(required_role: str):
     def _checker(user: User = Depends(get_current_active_user)) -> User:
         if not has_role(user.role, required_role):
@@ -0,0 +1,219 @@
+"""Refresh token families with rotation and server-side revocation."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import Any
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+
+from app.config import get_settings
+from app.security.tokens import create_refresh_token, refresh_token_lifetime
+from app.users.models import RefreshToken, User
+from app.utils.time import utcnow
+
+logger = logging.getLogger(__name__)
+
+REASON_ROTATED = "rotated"
+REASON_REUSED = "reuse_detected"
+REASON_LOGOUT = "logout"
+REASON_LOGOUT_ALL = "logout_all"
+
+
+def _as_aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RevocationFilter:
+    """In-memory set of revoked refresh token ids, synced from the database.
+
+    Revocations made by this process are added immediately; revocations made
+    by other workers are picked up by an incremental sync every
+    ``sync_seconds``. Entries are dropped once the token would have expired
+    anyway, so the set stays proportional to recently revoked tokens.
+
+    Rotated tokens are left out: every refresh rotates one, so they would
+    make the set as large as the refresh traffic, and reusing one already
+    fails the conditional update in :func:`rotate_refresh_token`.
+    """
+
+    def __init__(self, sync_seconds: float) -> None:
+        self.sync_seconds = sync_seconds
+        self._revoked: dict[str, datetime] = {}
+        self._synced_at: datetime | None = None
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def __contains__(self, token_id: str) -> bool:
+        return token_id in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, token_id: str, expires_at: datetime) -> None:
+        self._revoked[token_id] = _as_aware(expires_at)
+
+    def invalidate(self) -> None:
+        """Force a sync on the next check."""
+
+        self._next_sync = 0.0
+
+    def maybe_sync(self, session: Session) -> None:
+        if monotonic() < self._next_sync:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._sync(session)
+        finally:
+            self._lock.release()
+
+    def _sync(self, session: Session) -> None:
+        started = utcnow()
+        query = select(RefreshToken.id, RefreshToken.expires_at).where(
+            RefreshToken.revoked_at.is_not(None),
+            or_(RefreshToken.revoked_reason.is_(None), RefreshToken.revoked_reason != REASON_ROTATED),
+            RefreshToken.expires_at > started,
+        )
+        if self._synced_at is not None:
+            # Overlap the previous window so clock skew between workers cannot drop rows.
+            query = query.where(RefreshToken.revoked_at >= self._synced_at - timedelta(seconds=5))
+
+        for token_id, expires_at in session.exec(query).all():
+            self.add(token_id, expires_at)
+
+        for token_id, expires_at in list(self._revoked.items()):
+            if expires_at <= started:
+                self._revoked.pop(token_id, None)
+
+        self._synced_at = started
+        self._next_sync = monotonic() + self.sync_seconds
+
+
+revocation_filter = RevocationFilter(get_settings().refresh_revocation_sync_seconds)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+def issue_refresh_token(session: Session, user: User, *, family_id: str | None = None) -> str:
+    """Persist a new refresh token row and return the signed token.
+
+    The caller is responsible for committing the session.
+    """
+
+    record = RefreshToken(
+        family_id=family_id or str(uuid4()),
+        user_id=user.id,
+        expires_at=utcnow() + refresh_token_lifetime(),
+    )
+    session.add(record)
+    return create_refresh_token(
+        user.id, token_id=record.id, family_id=record.family_id, epoch=user.token_epoch
+    )
+
+
+def rotate_refresh_token(session: Session, payload: dict[str, Any]) -> tuple[User, str]:
+    """Exchange a refresh token for a new one in the same family.
+
+    A token that was already rotated (outside a short grace period for
+    concurrent tabs) or revoked is treated as stolen and its whole family is
+    revoked.
+    """
+
+    token_id = payload.get("jti")
+    family_id = payload.get("fam")
+    subject = payload.get("sub")
+    if not token_id or not family_id or not subject:
+        raise _unauthorized("Invalid token")
+
+    revocation_filter.maybe_sync(session)
+    if token_id in revocation_filter:
+        _reject_reuse(session, token_id, family_id)
+
+    user = session.get(User, subject)
+    if not user or user.disabled:
+        raise _unauthorized("User not found")
+    if payload.get("epoch", 0) != user.token_epoch:
+        raise _unauthorized("Token revoked")
+
+    now = utcnow()
+    result = session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.id == token_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now, revoked_reason=REASON_ROTATED)
+    )
+    if result.rowcount != 1:
+        session.rollback()
+        _reject_reuse(session, token_id, family_id)
+
+    token = issue_refresh_token(session, user, family_id=family_id)
+    session.commit()
+    return user, token
+
+
+def _reject_reuse(session: Session, token_id: str, family_id: str) -> None:
+    record = session.get(RefreshToken, token_id)
+    if not record or record.family_id != family_id:
+        raise _unauthorized("Invalid token")
+
+    grace = timedelta(seconds=get_settings().refresh_reuse_grace_seconds)
+    if (
+        record.revoked_reason == REASON_ROTATED
+        and record.revoked_at is not None
+        and utcnow() - _as_aware(record.revoked_at) <= grace
+    ):
+        raise _unauthorized("Refresh token already used")
+
+    if record.revoked_reason == REASON_ROTATED:
+        logger.warning("Refresh token reuse detected for family %s; revoking", family_id)
+        revoke_family(session, family_id, reason=REASON_REUSED)
+    raise _unauthorized("Token revoked")
+
+
+def revoke_family(session: Session, family_id: str, *, reason: str = REASON_LOGOUT) -> int:
+    """Revoke every active token in a family and return how many were revoked."""
+
+    active = session.exec(
+        select(RefreshToken.id, RefreshToken.expires_at).where(
+            RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None)
+        )
+    ).all()
+    if not active:
+        return 0
+
+    session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=utcnow(), revoked_reason=reason)
+    )
+    session.commit()
+    for token_id, expires_at in active:
+        revocation_filter.add(token_id, expires_at)
+    return len(active)
+
+
+def revoke_user_tokens(session: Session, user: User, *, reason: str = REASON_LOGOUT_ALL) -> None:
+    """Log a user out everywhere by bumping their token epoch.
+
+    Outstanding access and refresh tokens carry the old epoch and stop
+    validating immediately; the refresh rows are also marked revoked so the
+    table reflects the logout.
+    """
+
+    user.token_epoch = (user.token_epoch or 0) + 1
+    session.add(user)
+    session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=utcnow(), revoked_reason=reason)
+    )
+    session.commit()
+    revocation_filter.invalidate()
@@ -35,13 +35,32 @@ def create_access_token(
     email: str | None = None,
     name: str | None = None,
     username: str | None = None,
+    epoch: int | None = None,
 ) -> str:
-    extra = {"role": role, "company_id": company_id, "email": email, "name": name, "username": username}
+    extra = {
+        "role": role,
+        "company_id": company_id,
+        "email": email,
+        "name": name,
+        "username": username,
+        "epoch": epoch,
+    }
     return _create_token(subject, timedelta(minutes=_settings.jwt_expire_minutes), TokenType.ACCESS, extra)
 
 
-def create_refresh_token(subject: str) -> str:
-    return _create_token(subject, timedelta(days=_settings.jwt_refresh_expire_days), TokenType.REFRESH)
+def create_refresh_token(
+    subject: str,
+    *,
+    token_id: str | None = None,
+    family_id: str | None = None,
+    epoch: int | None = None,
+) -> str:
+    extra = {"jti": token_id, "fam": family_id, "epoch": epoch}
+    return _create_token(subject, refresh_token_lifetime(), TokenType.REFRESH, extra)
+
+
+def refresh_token_lifetime() -> timedelta:
+    return timedelta(days=_settings.jwt_refresh_expire_days)
 
 
 def decode_token(token: str) -> dict[str, Any]:
@@ -0,0 +1,94 @@
+"""Boot sequence: wait for the database, migrate, seed, optionally warm up, and time each phase."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import perf_counter
+
+from starlette.concurrency import run_in_threadpool
+
+from app.ai import engine as ai_engine
+from app.bootstrap import bootstrap_founder_from_env
+from app.config import get_settings
+from app.db import async_engine, engine, wait_for_database
+from app.migrations import migrate
+from app.users.retention import start_retention_sweeper
+
+logger = logging.getLogger("phill.startup")
+
+# Imported on first use rather than at boot; WARMUP_IMPORTS loads them in the background once serving.
+LAZY_MODULES = ("pypdf", "aiosmtplib")
+
+boot_timings: dict[str, float] = {}
+
+
+@contextmanager
+def _phase(name: str) -> Iterator[None]:
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        boot_timings[name] = round(perf_counter() - started, 3)
+
+
+def record_import_time(seconds: float) -> None:
+    boot_timings["imports"] = round(seconds, 3)
+
+
+def start_up() -> None:
+    settings = get_settings()
+    with _phase("database"):
+        attempts = wait_for_database()
+    if settings.db_migrate_on_startup:
+        with _phase("migrations"):
+            migrate()
+    else:
+        logger.info("DB_MIGRATE_ON_STARTUP is off; run scripts/migrate.py before starting new code")
+    with _phase("bootstrap"):
+        bootstrap_founder_from_env()
+    start_retention_sweeper()
+    logger.info("Database ready after %s attempt(s)", attempts)
+
+
+def _fill_pool(count: int) -> None:
+    connections = [engine.connect() for _ in range(count)]
+    for connection in connections:
+        connection.close()
+
+
+async def _fill_async_pool(count: int) -> None:
+    connections = await asyncio.gather(*(async_engine.connect() for _ in range(count)))
+    for connection in connections:
+        await connection.close()
+
+
+def _import_lazy_modules() -> None:
+    started = perf_counter()
+    try:
+        ai_engine.warm_up()
+        for name in LAZY_MODULES:
+            importlib.import_module(name)
+    except Exception:  # pragma: no cover - optional dependencies
+        logger.exception("Import warm-up failed")
+        return
+    logger.info("Imported deferred modules in %.2fs", perf_counter() - started)
+
+
+async def warm_up() -> None:
+    """Open ``WARMUP_DB_CONNECTIONS`` per pool before serving and start the background import warm-up."""
+
+    settings = get_settings()
+    count = min(settings.warmup_db_connections, settings.db_pool_size)
+    if count > 0:
+        with _phase("warmup"):
+            await asyncio.gather(run_in_threadpool(_fill_pool, count), _fill_async_pool(count))
+    if settings.warmup_imports:
+        threading.Thread(target=_import_lazy_modules, name="phill-warmup", daemon=True).start()
+
+    summary = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in boot_timings.items())
+    logger.info("Startup timings: %s", summary, extra={"boot_seconds": dict(boot_timings)})
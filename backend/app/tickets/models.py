@@ -1,11 +1,18 @@
 from datetime import datetime
 from uuid import uuid4
 
+from sqlalchemy import Index
 from sqlmodel import Column, DateTime, Field, SQLModel
 
 
 class Ticket(SQLModel, table=True):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Keyset pagination (newest first) within a company, one user's rows, or one status.
+        Index("ix_tickets_company_created", "company_id", "created_at", "id"),
+        Index("ix_tickets_company_user_created", "company_id", "user_id", "created_at", "id"),
+        Index("ix_tickets_company_status_created", "company_id", "status", "created_at", "id"),
+    )
 
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     company_id: str = Field(foreign_key="companies.id", index=True)
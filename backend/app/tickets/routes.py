@@ -1,40 +1,60 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
-from app.security.dependencies import get_current_active_user
+from app.companies.cache import Tenant
+from app.db import get_async_session
+from app.replica import get_async_read_session
+from app.security.dependencies import get_current_active_user_async, get_current_tenant_async
 from app.tickets.models import Ticket
 from app.tickets.schemas import TicketCreate, TicketRead
 from app.tickets.service import create_ticket
 from app.users.models import User
+from app.utils.etag import collection_etag, conditional_response
+from app.utils.pagination import Page, page_params, page_rows, paginate
 from app.users.permissions import ROLE_SUPERVISOR, has_role
 
 router = APIRouter()
 
 
 @router.post("/", response_model=TicketRead)
-def open_ticket(
+async def open_ticket(
     payload: TicketCreate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user_async),
+    tenant: Tenant = Depends(get_current_tenant_async),
 ) -> TicketRead:
-    ticket = create_ticket(
+    ticket = await create_ticket(
         payload,
         session,
-        company_id=current_user.company_id,
+        company_id=tenant.id,
         user_id=current_user.id,
     )
     return TicketRead.model_validate(ticket)
 
 
 @router.get("/", response_model=list[TicketRead])
-def list_tickets(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_active_user),
+async def list_tickets(
+    request: Request,
+    response: Response,
+    status_filter: str | None = Query(default=None, alias="status"),
+    user_id: str | None = Query(default=None),
+    page: Page = Depends(page_params),
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: User = Depends(get_current_active_user_async),
+    tenant: Tenant = Depends(get_current_tenant_async),
 ) -> list[TicketRead]:
-    query = select(Ticket).where(Ticket.company_id == current_user.company_id)
-    if not has_role(current_user.role, ROLE_SUPERVISOR):
-        query = query.where(Ticket.user_id == current_user.id)
+    # Only supervisors see other users' tickets; everyone else is limited to their own.
+    owner = user_id if has_role(current_user.role, ROLE_SUPERVISOR) else current_user.id
+    etag = await session.run_sync(collection_etag, "tickets", tenant.id, owner, status_filter, page)
+    if (not_modified := conditional_response(request, response, etag)) is not None:
+        return not_modified
 
-    tickets = session.exec(query).all()
+    query = select(Ticket).where(Ticket.company_id == tenant.id)
+    if owner:
+        query = query.where(Ticket.user_id == owner)
+    if status_filter:
+        query = query.where(Ticket.status == status_filter)
+
+    tickets = page_rows(request, response, (await session.exec(paginate(query, Ticket, page))).all(), page)
     return [TicketRead.model_validate(ticket) for ticket in tickets]
@@ -1,12 +1,9 @@
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.tickets.models import Ticket
 from app.tickets.schemas import TicketCreate
+from app.utils.persistence import insert_row_async
 
 
-def create_ticket(payload: TicketCreate, session: Session, *, company_id: str, user_id: str) -> Ticket:
-    ticket = Ticket(company_id=company_id, user_id=user_id, **payload.model_dump())
-    session.add(ticket)
-    session.commit()
-    session.refresh(ticket)
-    return ticket
+async def create_ticket(payload: TicketCreate, session: AsyncSession, *, company_id: str, user_id: str) -> Ticket:
+    return await insert_row_async(session, Ticket(company_id=company_id, user_id=user_id, **payload.model_dump()))
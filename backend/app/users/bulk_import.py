@@ -0,0 +1,263 @@
+"""Bulk user import from CSV, shared by ``POST /api/users/import`` and ``scripts/import_users.py``.
+
+Rows are read one at a time and handled in batches of ``USER_IMPORT_BATCH_SIZE``:
+each batch is validated, checked for taken emails and usernames with one
+``IN`` query per column, hashed on a thread pool (Argon2 releases the GIL,
+so hashes run on all cores) and stored with one multi-row insert. A bad
+row only fails itself; it is reported with its CSV line number and the
+rest of the file is still imported.
+
+Columns: ``email`` and ``password`` are required; ``username`` (defaults
+to the email), ``name``, ``role`` (default ``user``), ``company_domain``
+and ``company_name`` are optional. Rows without ``company_domain`` go to
+the default company. Unknown domains are created as new companies
+(named ``company_name`` or the domain) when the importer may manage
+every company. A new company is inserted in the same transaction as its
+users, so one whose rows all fail is not left behind empty.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import TextIO
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.companies.models import Company
+from app.config import get_settings
+from app.security.password import hash_password
+from app.users.models import User
+from app.users.permissions import ROLE_FOUNDER, ROLE_HIERARCHY, has_role
+from app.users.schemas import UserImportError, UserImportReport, UserImportRow
+from app.utils.email import normalize_email
+from app.utils.persistence import insert_rows
+
+REQUIRED_COLUMNS = ("email", "password")
+
+
+@dataclass
+class _Candidate:
+    line: int
+    row: UserImportRow
+    email: str
+    username: str
+    domain: str | None
+
+
+class UserImporter:
+    """Imports one CSV. ``actor`` is the user running the import, or None for the trusted CLI."""
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        actor: User | None,
+        default_company_id: str | None,
+        dry_run: bool = False,
+        batch_size: int | None = None,
+        workers: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.session = session
+        self.actor = actor
+        self.default_company_id = default_company_id
+        self.dry_run = dry_run
+        self.batch_size = batch_size or settings.user_import_batch_size
+        self.workers = workers or settings.user_import_hash_workers or os.cpu_count() or 1
+        # Only founders (and the CLI) work across companies or create new ones.
+        self.all_companies = actor is None or has_role(actor.role, ROLE_FOUNDER)
+        self.report = UserImportReport(dry_run=dry_run)
+        self._seen_emails: set[str] = set()
+        self._seen_usernames: set[str] = set()
+        self._companies: dict[str, str] = {}
+
+    def run(self, stream: TextIO) -> UserImportReport:
+        reader = csv.DictReader(stream)
+        columns = {(name or "").strip().lower() for name in reader.fieldnames or ()}
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"CSV is missing column(s): {', '.join(missing)}"
+            )
+
+        rows = ((reader.line_num, raw) for raw in reader)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="phill-import") as pool:
+            for batch in _batches(rows, self.batch_size):
+                self._import_batch(batch, pool)
+        self.report.errors.sort(key=lambda error: error.line)
+        return self.report
+
+    def _fail(self, line: int, email: str | None, error: str) -> None:
+        self.report.errors.append(UserImportError(line=line, email=email, error=error))
+
+    def _import_batch(self, batch: list[tuple[int, dict]], pool: ThreadPoolExecutor) -> None:
+        self.report.rows += len(batch)
+        candidates = [candidate for line, raw in batch if (candidate := self._validate(line, raw)) is not None]
+        candidates = self._check_taken(candidates)
+        candidates, new_companies = self._resolve_companies(candidates)
+        if self.dry_run:
+            self.report.created += len(candidates)
+            self.report.companies_created += len(new_companies)
+            return
+
+        if candidates:
+            hashes = pool.map(hash_password, [candidate.row.password for candidate in candidates])
+            users = [
+                User(
+                    company_id=self._company_id(candidate),
+                    email=candidate.email,
+                    username=candidate.username,
+                    name=candidate.row.name or candidate.row.username or candidate.email,
+                    role=candidate.row.role,
+                    password_hash=password_hash,
+                )
+                for candidate, password_hash in zip(candidates, hashes)
+            ]
+            self._insert(candidates, users, new_companies)
+        # Companies that were not stored are looked up (or created) again by a later batch.
+        for domain in new_companies:
+            self._companies.pop(domain, None)
+
+    def _insert(self, candidates: list[_Candidate], users: list[User], new_companies: dict[str, Company]) -> None:
+        """Store users with their new companies; the companies that could not be stored stay in ``new_companies``."""
+
+        try:
+            insert_rows(self.session, [*new_companies.values(), *users])
+        except IntegrityError:
+            self.session.rollback()
+        else:
+            self.report.created += len(users)
+            self.report.companies_created += len(new_companies)
+            new_companies.clear()
+            return
+
+        # A concurrent import may have created one of the companies since the lookup; join its row instead.
+        self._adopt_existing_companies(candidates, users, new_companies)
+        # Someone else may also have taken an email or username since the check; find the rows one at a time.
+        for candidate, user in zip(candidates, users):
+            company = new_companies.get(candidate.domain) if candidate.domain else None
+            try:
+                insert_rows(self.session, [company, user] if company else [user])
+            except IntegrityError:
+                self.session.rollback()
+                self._fail(candidate.line, candidate.email, "Email or username already in use")
+                continue
+            self.report.created += 1
+            if company:
+                del new_companies[candidate.domain]
+                self.report.companies_created += 1
+
+    def _adopt_existing_companies(
+        self, candidates: list[_Candidate], users: list[User], new_companies: dict[str, Company]
+    ) -> None:
+        if not new_companies:
+            return
+        found = dict(
+            self.session.exec(
+                select(func.lower(Company.domain), Company.id).where(func.lower(Company.domain).in_(new_companies))
+            ).all()
+        )
+        for domain, company_id in found.items():
+            new_companies.pop(domain, None)
+            self._companies[domain] = company_id
+        for candidate, user in zip(candidates, users):
+            if candidate.domain in found:
+                user.company_id = found[candidate.domain]
+
+    def _validate(self, line: int, raw: dict) -> _Candidate | None:
+        cells = {
+            key.strip().lower(): value.strip()
+            for key, value in raw.items()
+            if isinstance(key, str) and isinstance(value, str) and value.strip()
+        }
+        try:
+            row = UserImportRow.model_validate(cells)
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            self._fail(line, cells.get("email"), f"{field}: {error['msg']}")
+            return None
+
+        email = normalize_email(row.email)
+        username = row.username or email
+        if row.role not in ROLE_HIERARCHY:
+            self._fail(line, email, f"Unknown role {row.role!r}")
+        elif self.actor is not None and not has_role(self.actor.role, row.role):
+            self._fail(line, email, "Cannot assign higher role than your own")
+        elif email in self._seen_emails:
+            self._fail(line, email, "Email appears earlier in the file")
+        elif username in self._seen_usernames:
+            self._fail(line, email, "Username appears earlier in the file")
+        elif row.company_domain is None and self.default_company_id is None:
+            self._fail(line, email, "company_domain is required")
+        else:
+            self._seen_emails.add(email)
+            self._seen_usernames.add(username)
+            domain = row.company_domain.lower() if row.company_domain else None
+            return _Candidate(line, row, email, username, domain)
+        return None
+
+    def _check_taken(self, candidates: list[_Candidate]) -> list[_Candidate]:
+        if not candidates:
+            return candidates
+        emails = {candidate.email for candidate in candidates}
+        usernames = {candidate.username for candidate in candidates}
+        taken_emails = set(self.session.exec(select(func.lower(User.email)).where(func.lower(User.email).in_(emails))))
+        taken_usernames = set(self.session.exec(select(User.username).where(User.username.in_(usernames))))
+
+        available = []
+        for candidate in candidates:
+            if candidate.email in taken_emails:
+                self._fail(candidate.line, candidate.email, "Email already in use")
+            elif candidate.username in taken_usernames:
+                self._fail(candidate.line, candidate.email, "Username already in use")
+            else:
+                available.append(candidate)
+        return available
+
+    def _resolve_companies(self, candidates: list[_Candidate]) -> tuple[list[_Candidate], dict[str, Company]]:
+        """Drop rows the actor may not import and prepare (unsaved) companies for unknown domains."""
+
+        domains = {candidate.domain for candidate in candidates if candidate.domain} - set(self._companies)
+        if domains:
+            found = self.session.exec(
+                select(func.lower(Company.domain), Company.id).where(func.lower(Company.domain).in_(domains))
+            ).all()
+            self._companies.update(dict(found))
+
+        resolved = []
+        new_companies: dict[str, Company] = {}
+        for candidate in candidates:
+            company_id = self._companies.get(candidate.domain) if candidate.domain else self.default_company_id
+            if candidate.domain and company_id is None:
+                if not self.all_companies:
+                    self._fail(candidate.line, candidate.email, f"Unknown company {candidate.domain}")
+                    continue
+                if candidate.domain not in new_companies:
+                    new_companies[candidate.domain] = Company(
+                        name=candidate.row.company_name or candidate.domain, domain=candidate.domain
+                    )
+            elif not self.all_companies and company_id != self.actor.company_id:
+                self._fail(candidate.line, candidate.email, "Cannot import into another company")
+                continue
+            resolved.append(candidate)
+
+        self._companies.update({domain: company.id for domain, company in new_companies.items()})
+        return resolved, new_companies
+
+    def _company_id(self, candidate: _Candidate) -> str:
+        return self._companies[candidate.domain] if candidate.domain else self.default_company_id
+
+
+def _batches(rows: Iterator[tuple[int, dict]], size: int) -> Iterator[list[tuple[int, dict]]]:
+    while batch := list(islice(rows, size)):
+        yield batch
@@ -1,11 +1,17 @@
 from datetime import datetime
 from uuid import uuid4
 
+from sqlalchemy import Index, func
 from sqlmodel import Column, DateTime, Field, SQLModel
 
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination (newest first) within a company, and across all of them for founders.
+        Index("ix_users_company_created", "company_id", "created_at", "id"),
+        Index("ix_users_created", "created_at", "id"),
+    )
 
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     company_id: str = Field(foreign_key="companies.id", index=True)
@@ -15,9 +21,14 @@ class User(SQLModel, table=True):
     role: str = Field(default="user")
     password_hash: str
     disabled: bool = Field(default=False)
+    token_epoch: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True)))
 
 
+# Case-insensitive email lookups (`lower(email) = :email`) would otherwise scan the table.
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
+
+
 class PasswordResetRequest(SQLModel, table=True):
     __tablename__ = "password_reset_requests"
 
@@ -25,7 +36,9 @@ class PasswordResetRequest(SQLModel, table=True):
     email: str = Field(index=True)
     ip_address: str | None = Field(default=None)
     user_agent: str | None = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True)))
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), index=True)
+    )
 
 
 class AccessRequest(SQLModel, table=True):
@@ -36,15 +49,33 @@ class AccessRequest(SQLModel, table=True):
     note: str | None = Field(default=None)
     ip_address: str | None = Field(default=None)
     user_agent: str | None = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True)))
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True), index=True)
+    )
 
 
 class PasswordResetToken(SQLModel, table=True):
     __tablename__ = "password_reset_tokens"
+    __table_args__ = (
+        # Serves confirm_password_reset (hash + expiry) without touching the heap for stale rows.
+        Index("ix_password_reset_tokens_hash_expires", "token_hash", "expires_at"),
+    )
 
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     user_id: str = Field(foreign_key="users.id", index=True)
     token_hash: str = Field(index=True)
-    expires_at: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    expires_at: datetime = Field(sa_column=Column(DateTime(timezone=True), index=True))
     used_at: datetime | None = Field(default=None, sa_column=Column(DateTime(timezone=True)))
     created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True)))
+
+
+class RefreshToken(SQLModel, table=True):
+    __tablename__ = "refresh_tokens"
+
+    id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
+    family_id: str = Field(index=True)
+    user_id: str = Field(foreign_key="users.id", index=True)
+    expires_at: datetime = Field(sa_column=Column(DateTime(timezone=True), index=True))
+    revoked_at: datetime | None = Field(default=None, sa_column=Column(DateTime(timezone=True), index=True))
+    revoked_reason: str | None = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=True)))
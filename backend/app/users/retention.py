@@ -0,0 +1,123 @@
+"""Background retention sweeper for token and request-log tables."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlmodel import Session
+
+from app.config import get_settings
+from app.db import engine
+from app.users.models import AccessRequest, PasswordResetRequest, PasswordResetToken, RefreshToken
+from app.utils.time import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def _delete_in_batches(session: Session, model, column, cutoff: datetime, batch_size: int) -> int:
+    """Delete rows with ``column < cutoff`` in small committed batches.
+
+    Short transactions keep row locks brief so the sweep never stalls the
+    request paths that insert into the same tables.
+    """
+
+    total = 0
+    while True:
+        ids = select(model.id).where(column < cutoff).limit(batch_size).scalar_subquery()
+        result = session.exec(delete(model).where(model.id.in_(ids)))
+        session.commit()
+        deleted = result.rowcount or 0
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def sweep_expired_records(now: datetime | None = None) -> dict[str, int]:
+    """Delete expired tokens and request rows older than their retention window."""
+
+    settings = get_settings()
+    now = now or utcnow()
+    batch_size = max(1, settings.retention_batch_size)
+    token_cutoff = now - timedelta(hours=settings.token_retention_hours)
+
+    targets = (
+        ("password_reset_tokens", PasswordResetToken, PasswordResetToken.expires_at, token_cutoff),
+        ("refresh_tokens", RefreshToken, RefreshToken.expires_at, token_cutoff),
+        (
+            "password_reset_requests",
+            PasswordResetRequest,
+            PasswordResetRequest.created_at,
+            now - timedelta(days=settings.reset_request_retention_days),
+        ),
+        (
+            "access_requests",
+            AccessRequest,
+            AccessRequest.created_at,
+            now - timedelta(days=settings.access_request_retention_days),
+        ),
+    )
+
+    deleted: dict[str, int] = {}
+    with Session(engine) as session:
+        for name, model, column, cutoff in targets:
+            deleted[name] = _delete_in_batches(session, model, column, cutoff, batch_size)
+
+    if any(deleted.values()):
+        logger.info("Retention sweep removed %s", deleted)
+    return deleted
+
+
+class RetentionSweeper:
+    """Run :func:`sweep_expired_records` on a daemon thread at a fixed interval."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="phill-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        # Jitter the first run so several workers started together do not sweep in lockstep.
+        delay = random.uniform(0, min(self.interval_seconds, 60))
+        while not self._stop.wait(delay):
+            try:
+                sweep_expired_records()
+            except Exception as exc:  # pragma: no cover - database dependent
+                logger.warning("Retention sweep failed: %s", exc)
+            delay = self.interval_seconds
+
+
+_sweeper: RetentionSweeper | None = None
+
+
+def start_retention_sweeper() -> None:
+    global _sweeper
+
+    settings = get_settings()
+    if not settings.retention_enabled:
+        logger.info("Retention sweeper disabled")
+        return
+    if _sweeper is None:
+        _sweeper = RetentionSweeper(settings.retention_interval_seconds)
+    _sweeper.start()
+
+
+def stop_retention_sweeper() -> None:
+    if _sweeper is not None:
+        _sweeper.stop()
@@ -1,30 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import io
+
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, Response, UploadFile, status
 from sqlmodel import Session, select
 
-from app.companies.models import Company
+from app.companies.cache import Tenant, company_names
 from app.db import get_session
-from app.security.dependencies import get_current_active_user, require_role
+from app.replica import get_read_session
+from app.security.dependencies import get_current_active_user, get_current_tenant, require_role
 from app.users.models import User
 from app.users.schemas import (
     PasswordChange,
     PasswordSet,
     UserAdminUpdate,
     UserCreate,
+    UserImportReport,
     UserRead,
     UserUpdate,
 )
+from app.users.bulk_import import UserImporter
 from app.users.service import create_user, set_password, update_profile, update_user_admin
 from app.users.permissions import ROLE_MANAGER, ROLE_FOUNDER, has_role
 from app.security.password import hash_password, verify_password
+from app.utils.etag import collection_etag, conditional_response
+from app.utils.pagination import Page, page_params, page_rows, paginate
 
 router = APIRouter()
 
 
-def _company_names(session: Session, company_ids: set[str]) -> dict[str, str]:
-    if not company_ids:
-        return {}
-    rows = session.exec(select(Company).where(Company.id.in_(company_ids))).all()
-    return {row.id: row.name for row in rows}
+def _user_read(session: Session, user: User) -> UserRead:
+    names = company_names(session, {user.company_id})
+    return UserRead.model_validate(user).model_copy(update={"company_name": names.get(user.company_id)})
 
 
 @router.post("/", response_model=UserRead)
@@ -32,18 +37,38 @@ def register_user(
     payload: UserCreate,
     session: Session = Depends(get_session),
     current_user: User = Depends(require_role(ROLE_MANAGER)),
+    tenant: Tenant = Depends(get_current_tenant),
 ) -> UserRead:
     target_company_id = (
-        payload.company_id if has_role(current_user.role, ROLE_FOUNDER) and payload.company_id else current_user.company_id
+        payload.company_id if has_role(current_user.role, ROLE_FOUNDER) and payload.company_id else tenant.id
     )
 
     if not has_role(current_user.role, payload.role):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot assign higher role than your own")
 
     user = create_user(payload, session, company_id=target_company_id)
-    company_names = _company_names(session, {user.company_id})
-    user.company_name = company_names.get(user.company_id)
-    return UserRead.model_validate(user)
+    return _user_read(session, user)
+
+
+@router.post("/import", response_model=UserImportReport)
+def import_users(
+    file: UploadFile,
+    dry_run: bool = Form(default=False),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_role(ROLE_MANAGER)),
+    tenant: Tenant = Depends(get_current_tenant),
+) -> UserImportReport:
+    """Create users from a CSV upload; rows that fail are listed in ``errors`` with their line number."""
+
+    # The upload is spooled to disk by the form parser; rows are read from it one at a time.
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    importer = UserImporter(session, actor=current_user, default_company_id=tenant.id, dry_run=dry_run)
+    try:
+        return importer.run(stream)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV must be UTF-8 encoded")
+    finally:
+        stream.detach()
 
 
 @router.get("/me", response_model=UserRead)
@@ -53,19 +78,32 @@ def read_current_user(current_user: User = Depends(get_current_active_user)) ->
 
 @router.get("/", response_model=list[UserRead])
 def list_users(
-    session: Session = Depends(get_session), current_user: User = Depends(require_role(ROLE_MANAGER))
+    request: Request,
+    response: Response,
+    role: str | None = Query(default=None),
+    disabled: bool | None = Query(default=None),
+    page: Page = Depends(page_params),
+    session: Session = Depends(get_read_session),
+    current_user: User = Depends(require_role(ROLE_MANAGER)),
+    tenant: Tenant = Depends(get_current_tenant),
 ) -> list[UserRead]:
-    query = select(User)
-    if not has_role(current_user.role, ROLE_FOUNDER):
-        query = query.where(User.company_id == current_user.company_id)
+    # Founders see every company unless they pick one with X-Company-ID.
+    all_companies = has_role(current_user.role, ROLE_FOUNDER) and not getattr(request.state, "company_id", None)
+    etag = collection_etag(session, "users", None if all_companies else tenant.id, role, disabled, page)
+    if (not_modified := conditional_response(request, response, etag)) is not None:
+        return not_modified
 
-    users = session.exec(query).all()
-    company_ids = {user.company_id for user in users}
-    company_names = _company_names(session, company_ids)
-    for user in users:
-        user.company_name = company_names.get(user.company_id)
+    query = select(User)
+    if not all_companies:
+        query = query.where(User.company_id == tenant.id)
+    if role:
+        query = query.where(User.role == role)
+    if disabled is not None:
+        query = query.where(User.disabled == disabled)
 
-    return [UserRead.model_validate(user) for user in users]
+    users = page_rows(request, response, session.exec(paginate(query, User, page)).all(), page)
+    names = company_names(session, {user.company_id for user in users})
+    return [UserRead.model_validate(user).model_copy(update={"company_name": names.get(user.company_id)}) for user in users]
 
 
 @router.post("/{user_id}/password", status_code=status.HTTP_204_NO_CONTENT)
@@ -142,9 +180,7 @@ def update_user(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is outside your company")
 
     updated = update_user_admin(target, payload, session, company_id=target_company)
-    company_names = _company_names(session, {updated.company_id})
-    updated.company_name = company_names.get(updated.company_id)
-    return UserRead.model_validate(updated)
+    return _user_read(session, updated)
 
 
 @router.patch("/me", response_model=UserRead)
@@ -154,9 +190,7 @@ def update_current_user(
     current_user: User = Depends(get_current_active_user),
 ) -> UserRead:
     user = update_profile(payload, session, current_user=current_user)
-    company_names = _company_names(session, {user.company_id})
-    user.company_name = company_names.get(user.company_id)
-    return UserRead.model_validate(user)
+    return _user_read(session, user)
 
 
 @router.post("/me/password", status_code=status.HTTP_204_NO_CONTENT)
@@ -47,3 +47,29 @@ class PasswordChange(BaseModel):
 
 class PasswordSet(BaseModel):
     password: str = Field(..., min_length=8)
+
+
+class UserImportRow(BaseModel):
+    """One CSV row of a bulk import; blank cells are treated as missing."""
+
+    email: EmailStr
+    password: str = Field(..., min_length=8)
+    username: str | None = Field(default=None, min_length=3)
+    name: str | None = Field(default=None, min_length=1)
+    role: str = Field(default="user")
+    company_domain: str | None = Field(default=None, min_length=3)
+    company_name: str | None = Field(default=None, min_length=1)
+
+
+class UserImportError(BaseModel):
+    line: int
+    email: str | None = None
+    error: str
+
+
+class UserImportReport(BaseModel):
+    dry_run: bool = False
+    rows: int = 0
+    created: int = 0
+    companies_created: int = 0
+    errors: list[UserImportError] = Field(default_factory=list)
@@ -6,6 +6,7 @@ from app.security.password import hash_password
 from app.users.models import User
 from app.users.schemas import PasswordSet, UserAdminUpdate, UserCreate, UserUpdate
 from app.utils.email import normalize_email
+from app.utils.persistence import insert_row
 
 
 def _ensure_unique(
@@ -30,30 +31,20 @@ def _ensure_unique(
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already in use")
 
 
-def _normalize_email(email: str) -> str:
-    return email.strip().lower()
+def get_user_by_identifier(session: Session, identifier: str) -> User | None:
+    """Look up a user by email or username using a single index per query.
 
+    Identifiers containing ``@`` are tried as emails first (through the
+    ``lower(email)`` index); usernames default to the email address, so a
+    miss falls back to the username index before giving up.
+    """
 
-def _ensure_unique(
-    session: Session,
-    *,
-    email: str | None = None,
-    username: str | None = None,
-    exclude_id: str | None = None,
-) -> None:
-    if email:
-        email_query = select(User.id).where(User.email == email)
-        if exclude_id:
-            email_query = email_query.where(User.id != exclude_id)
-        if session.exec(email_query).first():
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already in use")
-
-    if username:
-        username_query = select(User.id).where(User.username == username)
-        if exclude_id:
-            username_query = username_query.where(User.id != exclude_id)
-        if session.exec(username_query).first():
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already in use")
+    normalized = identifier.strip()
+    if "@" in normalized:
+        user = session.exec(select(User).where(func.lower(User.email) == normalize_email(normalized))).first()
+        if user:
+            return user
+    return session.exec(select(User).where(User.username == normalized)).first()
 
 
 def create_user(payload: UserCreate, session: Session, company_id: str) -> User:
@@ -68,10 +59,7 @@ def create_user(payload: UserCreate, session: Session, company_id: str) -> User:
         role=payload.role,
         password_hash=hash_password(payload.password),
     )
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    return user
+    return insert_row(session, user)
 
 
 def update_profile(payload: UserUpdate, session: Session, current_user: User) -> User:
@@ -0,0 +1,134 @@
+"""Weak ETags for list endpoints backed by per-tenant collection version counters.
+
+Every ORM flush that touches a tracked table bumps ``collection_versions``
+for the affected company in the same transaction, so a list endpoint can
+answer ``If-None-Match`` with one primary-key lookup instead of running its
+query. Cross-tenant views use the sum of a collection's per-company
+versions, which also grows on every bump, so writes never contend on a
+shared row.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from itertools import chain
+
+from fastapi import Request, Response, status
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Field, Session, SQLModel, select, update
+
+# Scope label for cross-tenant views in the tag digest.
+ALL_COMPANIES = "*"
+
+
+class CollectionVersion(SQLModel, table=True):
+    __tablename__ = "collection_versions"
+
+    collection: str = Field(primary_key=True)
+    company_id: str = Field(primary_key=True)
+    version: int = Field(default=0)
+
+
+def _is_document(obj) -> bool:
+    return isinstance(obj.data, dict) and obj.data.get("type") == "document"
+
+
+def _company_ids(obj) -> set[str]:
+    """The row's company plus the one it was moved away from, if any."""
+
+    company_ids = {obj.company_id}
+    state = inspect(obj)
+    if state.persistent:
+        company_ids.update(state.attrs.company_id.history.deleted or ())
+    return {value for value in company_ids if value}
+
+
+def _touched_collections(session: Session) -> set[tuple[str, str]]:
+    touched: set[tuple[str, str]] = set()
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+    for obj in chain(session.new, modified, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table in ("tickets", "incidents", "users"):
+            touched.update((table, company_id) for company_id in _company_ids(obj))
+        elif table == "ai_memory" and _is_document(obj):
+            touched.update(("ai_documents", company_id) for company_id in _company_ids(obj))
+        elif table == "companies":
+            # Lists embed the company name.
+            touched.update({("users", obj.id), ("ai_documents", obj.id)})
+    return touched
+
+
+def _bump(session: Session, collection: str, company_id: str) -> None:
+    connection = session.connection()
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        statement = insert(CollectionVersion).values(collection=collection, company_id=company_id, version=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=["collection", "company_id"],
+            set_={"version": CollectionVersion.version + 1},
+        )
+        connection.execute(statement)
+        return
+
+    result = connection.execute(
+        update(CollectionVersion)
+        .where(CollectionVersion.collection == collection, CollectionVersion.company_id == company_id)
+        .values(version=CollectionVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(
+            CollectionVersion.__table__.insert().values(collection=collection, company_id=company_id, version=1)
+        )
+
+
+def _bump_versions(session: Session, _flush_context) -> None:
+    touched = _touched_collections(session)
+    for collection, company_id in sorted(touched):
+        _bump(session, collection, company_id)
+
+
+def track_collection_versions() -> None:
+    if not event.contains(Session, "after_flush", _bump_versions):
+        event.listen(Session, "after_flush", _bump_versions)
+
+
+def collection_etag(session: Session, collection: str, company_id: str | None, *variant: object) -> str:
+    """Weak ETag for one view of a collection.
+
+    ``variant`` holds whatever else changes the response for the same data
+    (caller role, user filter, query parameters) so different views never
+    share a tag.
+    """
+
+    scope = company_id or ALL_COMPANIES
+    if company_id is None:
+        query = select(func.sum(CollectionVersion.version)).where(CollectionVersion.collection == collection)
+    else:
+        query = select(CollectionVersion.version).where(
+            CollectionVersion.collection == collection, CollectionVersion.company_id == company_id
+        )
+    version = session.exec(query).first()
+    digest = hashlib.blake2b(repr((collection, scope, variant)).encode(), digest_size=8).hexdigest()
+    return f'W/"{version or 0}-{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Response | None:
+    """Set the ETag on ``response``; return a 304 when the client already has this version."""
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,120 @@
+"""Keyset pagination on ``(created_at, id)``, newest first.
+
+Lists return ``limit`` rows at a time (``DEFAULT_PAGE_SIZE`` unless the
+client asks for another size, never more than ``MAX_PAGE_SIZE``). The next
+page is requested with the opaque ``cursor`` from the previous page's
+``X-Next-Cursor`` header or ``Link: rel="next"`` URL. Each page is one index
+range scan from the cursor, so late pages cost the same as the first.
+
+Ranked results (search) have no stable key to continue from and page by
+offset instead: ``offset_page_params`` / ``offset_page_rows`` use the same
+``limit``, ``cursor`` and headers with the cursor holding the offset.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TypeVar
+
+from fastapi import HTTPException, Query, Request, Response, status
+from sqlalchemy import tuple_
+from sqlmodel.sql.expression import SelectOfScalar
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+Row = TypeVar("Row")
+
+
+@dataclass(frozen=True)
+class Page:
+    limit: int
+    after: tuple[datetime, str] | None = None
+
+
+@dataclass(frozen=True)
+class OffsetPage:
+    limit: int
+    offset: int = 0
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise _invalid_cursor()
+
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, max_length=200),
+) -> Page:
+    return Page(limit=limit, after=decode_cursor(cursor) if cursor else None)
+
+
+def paginate(statement: SelectOfScalar[Row], model, page: Page) -> SelectOfScalar[Row]:
+    """Order ``statement`` newest first from the cursor on, fetching one extra row to detect a next page."""
+
+    if page.after is not None:
+        statement = statement.where(tuple_(model.created_at, model.id) < tuple_(*page.after))
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(page.limit + 1)
+
+
+def page_rows(request: Request, response: Response, rows: Sequence[Row], page: Page) -> list[Row]:
+    """Drop the look-ahead row and advertise the next page in ``X-Next-Cursor`` and ``Link``."""
+
+    rows = list(rows)
+    if len(rows) <= page.limit:
+        return rows
+
+    rows = rows[: page.limit]
+    _next_page(request, response, encode_cursor(rows[-1].created_at, rows[-1].id), page.limit)
+    return rows
+
+
+def _next_page(request: Request, response: Response, cursor: str, limit: int) -> None:
+    url = request.url.include_query_params(cursor=cursor, limit=limit)
+    response.headers["X-Next-Cursor"] = cursor
+    response.headers["Link"] = f'<{url.path}?{url.query}>; rel="next"'
+
+
+def offset_page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, max_length=200),
+) -> OffsetPage:
+    if not cursor:
+        return OffsetPage(limit=limit)
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise _invalid_cursor()
+    if offset < 0:
+        raise _invalid_cursor()
+    return OffsetPage(limit=limit, offset=offset)
+
+
+def offset_page_rows(request: Request, response: Response, rows: Sequence[Row], page: OffsetPage) -> list[Row]:
+    """Like ``page_rows`` for results fetched with ``LIMIT page.limit + 1 OFFSET page.offset``."""
+
+    rows = list(rows)
+    if len(rows) <= page.limit:
+        return rows
+    cursor = base64.urlsafe_b64encode(str(page.offset + page.limit).encode()).decode().rstrip("=")
+    _next_page(request, response, cursor, page.limit)
+    return rows[: page.limit]
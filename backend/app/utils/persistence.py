@@ -0,0 +1,59 @@
+"""Insert new rows without reading them back.
+
+Every table gets its id and defaults on the client (``uuid4``,
+``datetime.utcnow``, plain defaults), so a freshly added object already
+holds what the database stored and the usual ``commit(); refresh(obj)``
+only spends a SELECT re-reading it. These helpers commit and hand the
+objects back as they are. A list goes out in a single flush, which
+SQLAlchemy sends as one batched multi-row ``INSERT``.
+
+The rows still go through the ORM flush, so collection versions (ETags)
+and the tenant cache see them. A column that is filled in by the database
+instead (``server_default``, triggers) needs ``eager_defaults`` on its
+model so the flush fetches it with ``INSERT ... RETURNING``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TypeVar
+
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+Model = TypeVar("Model", bound=SQLModel)
+
+
+def insert_rows(session: Session, rows: Iterable[Model]) -> list[Model]:
+    rows = list(rows)
+    if not rows:
+        return rows
+    session.add_all(rows)
+    # Expiring on commit would make the first attribute access re-select the row.
+    expire_on_commit, session.expire_on_commit = session.expire_on_commit, False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
+    return rows
+
+
+def insert_row(session: Session, row: Model) -> Model:
+    return insert_rows(session, [row])[0]
+
+
+async def insert_rows_async(session: AsyncSession, rows: Iterable[Model]) -> list[Model]:
+    rows = list(rows)
+    if not rows:
+        return rows
+    session.add_all(rows)
+    expire_on_commit, session.sync_session.expire_on_commit = session.sync_session.expire_on_commit, False
+    try:
+        await session.commit()
+    finally:
+        session.sync_session.expire_on_commit = expire_on_commit
+    return rows
+
+
+async def insert_row_async(session: AsyncSession, row: Model) -> Model:
+    return (await insert_rows_async(session, [row]))[0]
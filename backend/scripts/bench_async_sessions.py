@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Compare concurrent request capacity of sync and async database routes in one worker.
+
+Two endpoints run the same statement, one as a ``def`` route on
+``get_session`` (threadpool) and one as an ``async def`` route on
+``get_async_session``. Each statement waits ``--latency-ms`` inside the
+database driver (a sleep registered as a SQLite function, or ``pg_sleep`` on
+Postgres) to stand in for network and query time. Requests go straight
+through the ASGI interface with a fixed number in flight.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DB_FILE = os.path.join(tempfile.mkdtemp(prefix="phill-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("PASSWORD_PEPPER", "bench")
+# Big enough that the pool is not what limits either path; the threadpool (40) is the sync limit.
+os.environ.setdefault("DB_POOL_SIZE", "250")
+os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+os.environ.setdefault("DB_LIVENESS", "none")
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.db import async_engine, engine, get_async_session, get_session  # noqa: E402
+
+IS_SQLITE = engine.dialect.name == "sqlite"
+STATEMENT = text("SELECT phill_sleep(:seconds)" if IS_SQLITE else "SELECT pg_sleep(:seconds)")
+
+
+def _register_sleep(dbapi_connection, _record) -> None:
+    dbapi_connection.create_function("phill_sleep", 1, time.sleep)
+
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _register_sleep)
+    event.listen(async_engine.sync_engine, "connect", _register_sleep)
+
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_route(session: Session = Depends(get_session)) -> dict[str, str]:
+        session.exec(STATEMENT, params={"seconds": latency})
+        return {"status": "ok"}
+
+    @app.get("/async")
+    async def async_route(session: AsyncSession = Depends(get_async_session)) -> dict[str, str]:
+        await session.exec(STATEMENT, params={"seconds": latency})
+        return {"status": "ok"}
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} returned {message['status']}")
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def measure(app: FastAPI, path: str, concurrency: int, requests: int) -> tuple[float, float, float]:
+    """Return (requests per second, p50 ms, p99 ms) with ``concurrency`` requests in flight."""
+
+    durations: list[float] = []
+    remaining = requests
+
+    async def client() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            durations.append(await call(app, path))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(durations, n=100)
+    return requests / elapsed, statistics.median(durations) * 1000, quantiles[98] * 1000
+
+
+async def run(latency_ms: float, concurrency_levels: list[int], requests: int) -> None:
+    app = build_app(latency_ms / 1000)
+    for path in ("/sync", "/async"):
+        await measure(app, path, 10, 50)
+
+    print(f"{engine.dialect.name}, {latency_ms:g} ms per statement, {requests:,} requests per run")
+    print(f"  {'in flight':>9} {'route':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for concurrency in concurrency_levels:
+        for path in ("/sync", "/async"):
+            rate, p50, p99 = await measure(app, path, concurrency, max(requests, concurrency * 2))
+            print(f"  {concurrency:9d} {path[1:]:>6} {rate:9.0f} {p50:9.1f} {p99:9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Time each statement spends in the database")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[10, 40, 100, 200], help="Requests in flight per run"
+    )
+    parser.add_argument("--requests", type=int, default=1_000, help="Requests per run (default 1,000)")
+    args = parser.parse_args()
+    asyncio.run(run(args.latency_ms, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
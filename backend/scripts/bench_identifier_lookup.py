@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Benchmark login identifier lookups against a large users table.
+
+Compares the previous `username = :x OR email = :x` / `lower(email) = :x`
+queries with the split, index-backed lookups used by `_authenticate`.
+Runs against a throwaway SQLite file by default; pass `--database-url` to
+point it at a scratch Postgres database instead.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+USERS_DDL = """
+CREATE TABLE users (
+    id VARCHAR PRIMARY KEY,
+    email VARCHAR NOT NULL,
+    username VARCHAR NOT NULL
+)
+"""
+BASE_INDEXES = (
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    "CREATE UNIQUE INDEX ix_users_username ON users (username)",
+)
+LOWER_EMAIL_INDEX = "CREATE UNIQUE INDEX ix_users_email_lower ON users (lower(email))"
+
+LEGACY_OR = "SELECT id FROM users WHERE username = :ident OR email = :ident"
+LEGACY_LOWER = "SELECT id FROM users WHERE lower(email) = :ident"
+SPLIT_EMAIL = "SELECT id FROM users WHERE lower(email) = :ident"
+SPLIT_USERNAME = "SELECT id FROM users WHERE username = :ident"
+
+
+def seed(engine: Engine, rows: int, batch: int = 50_000) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS users"))
+        conn.execute(text(USERS_DDL))
+        for start in range(0, rows, batch):
+            chunk = [
+                {"id": f"u{n}", "email": f"user{n}@example.com", "username": f"user{n}"}
+                for n in range(start, min(start + batch, rows))
+            ]
+            conn.execute(text("INSERT INTO users (id, email, username) VALUES (:id, :email, :username)"), chunk)
+        for ddl in BASE_INDEXES:
+            conn.execute(text(ddl))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE users"))
+
+
+def time_queries(conn: Connection, label: str, run: Callable[[Connection, str], None], idents: list[str]) -> None:
+    start = time.perf_counter()
+    for ident in idents:
+        run(conn, ident)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<42} {len(idents):>6} lookups  {elapsed * 1000 / len(idents):9.3f} ms/lookup")
+
+
+def explain(conn: Connection, sql: str) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + sql), {"ident": "user1@example.com"}).all()
+    return " | ".join(str(row[-1]) for row in rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Scratch database URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Users to seed (default 1,000,000)")
+    parser.add_argument("--lookups", type=int, default=2_000, help="Lookups per scenario (default 2,000)")
+    parser.add_argument(
+        "--scan-lookups",
+        type=int,
+        default=20,
+        help="Lookups for the unindexed lower(email) scenario, which scans the table (default 20)",
+    )
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    engine = create_engine(url)
+    print(f"Seeding {args.rows:,} users into {engine.dialect.name}...")
+    started = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+    rng = random.Random(42)
+    emails = [f"user{rng.randrange(args.rows)}@example.com" for _ in range(args.lookups)]
+    usernames = [f"user{rng.randrange(args.rows)}" for _ in range(args.lookups)]
+
+    def legacy_or(conn: Connection, ident: str) -> None:
+        conn.execute(text(LEGACY_OR), {"ident": ident}).first()
+
+    def legacy_lower(conn: Connection, ident: str) -> None:
+        conn.execute(text(LEGACY_LOWER), {"ident": ident}).first()
+
+    def split(conn: Connection, ident: str) -> None:
+        if "@" in ident and conn.execute(text(SPLIT_EMAIL), {"ident": ident}).first():
+            return
+        conn.execute(text(SPLIT_USERNAME), {"ident": ident}).first()
+
+    with engine.connect() as conn:
+        print("Before (no lower(email) index):")
+        time_queries(conn, "  username OR email (email identifiers)", legacy_or, emails)
+        time_queries(conn, "  username OR email (username identifiers)", legacy_or, usernames)
+        time_queries(conn, "  lower(email) uniqueness check", legacy_lower, emails[: args.scan_lookups])
+        print(f"  plan: {explain(conn, LEGACY_LOWER)}")
+
+    with engine.begin() as conn:
+        conn.execute(text(LOWER_EMAIL_INDEX))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE users"))
+
+    with engine.connect() as conn:
+        print("\nAfter (ix_users_email_lower + split lookups):")
+        time_queries(conn, "  split lookup (email identifiers)", split, emails)
+        time_queries(conn, "  split lookup (username identifiers)", split, usernames)
+        time_queries(conn, "  lower(email) uniqueness check", legacy_lower, emails)
+        print(f"  plan: {explain(conn, SPLIT_EMAIL)}")
+
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
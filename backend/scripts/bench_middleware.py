@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Measure per-request middleware overhead before and after the pure-ASGI stack.
+
+Builds three apps around the same endpoints: no middleware, the previous
+four `@app.middleware("http")` functions (BaseHTTPMiddleware), and the
+current `install_*` middleware. Requests are driven straight through the
+ASGI interface so the numbers exclude any HTTP client or socket cost.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='phill-bench-')}/bench.db")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("PASSWORD_PEPPER", "bench")
+# One effectively unlimited policy so the limiter does its normal work without rejecting.
+os.environ.setdefault("RATE_LIMIT_POLICIES", '[{"name": "bench", "key": "ip", "limit": 1000000000}]')
+
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+
+from app.middleware.logging import install_logging_middleware  # noqa: E402
+from app.middleware.rate_limit import MemoryRateLimiter, install_rate_limit_middleware  # noqa: E402
+from app.middleware.security import install_security_headers  # noqa: E402
+from app.middleware.tenant import install_tenant_middleware  # noqa: E402
+
+CHUNKS = 64
+CHUNK = b"x" * 1024
+
+
+def add_endpoints(app: FastAPI) -> FastAPI:
+    @app.get("/api/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/api/stream")
+    async def stream() -> StreamingResponse:
+        async def body():
+            for _ in range(CHUNKS):
+                yield CHUNK
+
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    return app
+
+
+def bare_app() -> FastAPI:
+    return add_endpoints(FastAPI())
+
+
+def legacy_app() -> FastAPI:
+    """The BaseHTTPMiddleware stack this repo used before, reproduced verbatim."""
+
+    app = FastAPI()
+    limiter = MemoryRateLimiter(limit=10**9)
+    log = logging.getLogger("phill.bench")
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start = time.monotonic()
+        response = await call_next(request)
+        log.info("%s %s completed in %.3fs", request.method, request.url.path, time.monotonic() - start)
+        return response
+
+    @app.middleware("http")
+    async def rate_limit(request: Request, call_next):
+        client_ip = request.client.host if request.client else "anonymous"
+        if not limiter.allow(client_ip):
+            return Response(status_code=429)
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def add_tenant_context(request: Request, call_next):
+        request.state.company_id = request.headers.get("X-Company-ID")
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def add_security_headers(request, call_next):
+        response = await call_next(request)
+        response.headers.setdefault("Referrer-Policy", "no-referrer")
+        response.headers.setdefault("X-Content-Type-Options", "nosniff")
+        return response
+
+    return add_endpoints(app)
+
+
+def current_app() -> FastAPI:
+    app = FastAPI()
+    install_logging_middleware(app)
+    install_rate_limit_middleware(app)
+    install_tenant_middleware(app)
+    install_security_headers(app)
+    return add_endpoints(app)
+
+
+async def call(app: FastAPI, path: str) -> tuple[float, float]:
+    """Return (time to first body byte, total time) for one request."""
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"x-company-id", b"bench-co")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    first_byte: float | None = None
+    request_sent = False
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a real server, only report a disconnect once the client goes away.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} returned {message['status']}")
+        if message["type"] == "http.response.body" and message.get("body") and first_byte is None:
+            first_byte = time.perf_counter() - start
+
+    await app(scope, receive, send)
+    total = time.perf_counter() - start
+    return (first_byte if first_byte is not None else total), total
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> tuple[float, float]:
+    for _ in range(200):
+        await call(app, path)
+    samples = [await call(app, path) for _ in range(requests)]
+    return (
+        statistics.median(sample[0] for sample in samples) * 1e6,
+        statistics.median(sample[1] for sample in samples) * 1e6,
+    )
+
+
+async def run(requests: int) -> None:
+    apps = {"no middleware": bare_app(), "before (BaseHTTPMiddleware)": legacy_app(), "after (pure ASGI)": current_app()}
+    for path in ("/api/ping", "/api/stream"):
+        print(f"\n{path} ({requests:,} requests, median microseconds)")
+        print(f"  {'stack':<30} {'first byte':>12} {'total':>10}")
+        for label, app in apps.items():
+            first, total = await measure(app, path, requests)
+            print(f"  {label:<30} {first:12.1f} {total:10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5_000, help="Requests per scenario (default 5,000)")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Measure per-request overhead of each rate limit backend.
+
+Runs the in-process, SQLite and (with `--redis-url`) Redis backends over a
+mix of client keys, then checks that several processes sharing the SQLite
+file together stay within one limit.
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.middleware.rate_limit import MemoryRateLimiter  # noqa: E402
+from app.middleware.rate_limit_backends import RedisRateLimiter, SQLiteRateLimiter  # noqa: E402
+
+
+def bench(label: str, limiter, calls: int, clients: int) -> None:
+    keys = [f"client-{n % clients}" for n in range(calls)]
+    start = time.perf_counter()
+    for key in keys:
+        limiter.allow(key)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1e6 / calls:8.2f} us/request")
+
+
+def _shared_worker(path: str, limit: int, attempts: int, batch: int, results) -> None:
+    limiter = SQLiteRateLimiter(path, limit=limit, batch=batch)
+    results.put(sum(limiter.allow("shared-client") for _ in range(attempts)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50_000, help="Requests per backend (default 50,000)")
+    parser.add_argument("--clients", type=int, default=500, help="Distinct client keys (default 500)")
+    parser.add_argument("--batch", type=int, default=5, help="Lease batch size for shared backends (default 5)")
+    parser.add_argument("--workers", type=int, default=4, help="Processes for the shared-limit check (default 4)")
+    parser.add_argument("--redis-url", help="Redis-protocol server to include, e.g. redis://localhost:6379/15")
+    args = parser.parse_args()
+
+    # A generous limit keeps every call on the allow path, which is what production traffic mostly hits.
+    limit = args.calls
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "rate-limit.db")
+        bench("memory (per process)", MemoryRateLimiter(limit=limit), args.calls, args.clients)
+        bench("sqlite (per host)", SQLiteRateLimiter(path, limit=limit, batch=args.batch), args.calls, args.clients)
+        if args.redis_url:
+            redis_limiter = RedisRateLimiter(args.redis_url, limit=limit, batch=args.batch, prefix="phill:bench")
+            bench("redis (shared)", redis_limiter, args.calls, args.clients)
+
+        shared_limit = 100
+        results: multiprocessing.Queue = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=_shared_worker, args=(path, shared_limit, shared_limit * 2, args.batch, results))
+            for _ in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        allowed = sum(results.get() for _ in workers)
+        print(f"\n{args.workers} processes sharing a limit of {shared_limit}: {allowed} requests allowed")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 
 from app.bootstrap import bootstrap_founder
+from app.migrations import migrate_database
 
 
 def main() -> None:
@@ -20,6 +21,7 @@ def main() -> None:
     )
 
     args = parser.parse_args()
+    migrate_database()
 
     email, action = bootstrap_founder(
         company_name=args.company,
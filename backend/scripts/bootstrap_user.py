@@ -9,6 +9,7 @@ from sqlmodel import Session, select
 
 from app.companies.models import Company
 from app.db import engine
+from app.migrations import migrate_database
 from app.security.password import hash_password
 from app.users.models import User
 from app.users.permissions import ROLE_ADMIN, ROLE_HIERARCHY
@@ -85,6 +86,7 @@ def main() -> None:
     )
 
     args = parser.parse_args()
+    migrate_database()
 
     required = {
         "--company": args.company,
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Import users from a CSV file into DATABASE_URL.
+
+Columns: email, password (required); username, name, role, company_domain,
+company_name (optional). Rows without company_domain go to --company-domain.
+Companies that do not exist yet are created. Failed rows are printed (or
+written with --errors) with their line number; the rest are imported.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from time import perf_counter
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.companies.models import Company
+from app.db import engine
+from app.migrations import migrate_database
+from app.users.bulk_import import UserImporter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", help="CSV file to import, or - for stdin")
+    parser.add_argument("--company-domain", help="Company for rows without company_domain (must exist)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and check for conflicts without writing")
+    parser.add_argument("--errors", help="Write failed rows to this CSV instead of printing them")
+    parser.add_argument("--batch-size", type=int, help="Rows per batch (default USER_IMPORT_BATCH_SIZE)")
+    parser.add_argument("--workers", type=int, help="Password hashing threads (default USER_IMPORT_HASH_WORKERS or CPU count)")
+    args = parser.parse_args()
+    migrate_database()
+
+    stream = sys.stdin if args.csv == "-" else open(args.csv, encoding="utf-8-sig", newline="")
+    started = perf_counter()
+    with stream, Session(engine) as session:
+        default_company_id = None
+        if args.company_domain:
+            default_company_id = session.exec(
+                select(Company.id).where(func.lower(Company.domain) == args.company_domain.strip().lower())
+            ).first()
+            if default_company_id is None:
+                parser.error(f"No company with domain {args.company_domain}")
+        importer = UserImporter(
+            session,
+            actor=None,
+            default_company_id=default_company_id,
+            dry_run=args.dry_run,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+        try:
+            report = importer.run(stream)
+        except HTTPException as exc:
+            parser.error(exc.detail)
+    elapsed = perf_counter() - started
+
+    if args.errors:
+        with open(args.errors, "w", newline="") as target:
+            writer = csv.writer(target)
+            writer.writerow(["line", "email", "error"])
+            writer.writerows([error.line, error.email or "", error.error] for error in report.errors)
+    else:
+        for error in report.errors:
+            print(f"line {error.line}: {error.email or '-'}: {error.error}", file=sys.stderr)
+
+    verb = "Would create" if report.dry_run else "Created"
+    rate = report.rows / elapsed * 60 if elapsed else 0
+    print(
+        f"{verb} {report.created} of {report.rows} user(s) and {report.companies_created} company(ies); "
+        f"{len(report.errors)} failed; {elapsed:.1f}s ({rate:,.0f} rows/min)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Create missing tables and apply pending schema migrations to DATABASE_URL."""
+from __future__ import annotations
+
+import argparse
+import logging
+
+from app.db import engine
+from app.migrations import MIGRATIONS, applied_versions, migrate_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="List migrations and whether each is applied")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.status:
+        with engine.connect() as connection:
+            done = applied_versions(connection) if engine.dialect.has_table(connection, "schema_migrations") else set()
+        for step in MIGRATIONS:
+            print(f"{step.version:04d} {'applied' if step.version in done else 'pending':8} {step.name}")
+        return
+
+    applied = migrate_database()
+    print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
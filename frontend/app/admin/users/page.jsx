@@ -3,7 +3,7 @@
 import { useEffect, useMemo, useRef, useState } from "react";
 
 import AdminWall from "../../../components/AdminWall";
-import { fetchWithAuth } from "../../../lib/api";
+import { fetchWithAuth, nextCursor, withCursor } from "../../../lib/api";
 import { formatDateTime, formatRelative } from "../../../lib/dates";
 
 const ROLE_OPTIONS = [
@@ -42,6 +42,8 @@ export default function AdminUsersPage() {
   const [welcomeStatus, setWelcomeStatus] = useState({});
   const [deleteStatus, setDeleteStatus] = useState({});
   const [lastLoaded, setLastLoaded] = useState(null);
+  const [moreCursor, setMoreCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const cancelRef = useRef(false);
 
   const isFounder = currentUser?.role === "founder";
@@ -106,10 +108,12 @@ export default function AdminUsersPage() {
     }
   }, [companyFilter, companyMap, roleFilter, search, sort, users]);
 
-  const loadUsers = async () => {
-    setStatus({ state: "loading", message: "" });
+  // The list comes one page at a time; without a cursor it starts again from the newest accounts.
+  const loadUsers = async (cursor = null) => {
+    if (cursor) setLoadingMore(true);
+    else setStatus({ state: "loading", message: "" });
     try {
-      const res = await fetchWithAuth("/api/users");
+      const res = await fetchWithAuth(withCursor("/api/users", cursor));
       if (!res.ok) {
         const detail = await res.json().catch(() => ({}));
         if (!cancelRef.current) {
@@ -122,7 +126,9 @@ export default function AdminUsersPage() {
       }
       const data = await res.json();
       if (!cancelRef.current) {
-        setUsers(Array.isArray(data) ? data : []);
+        const page = Array.isArray(data) ? data : [];
+        setUsers((prev) => (cursor ? [...prev, ...page] : page));
+        setMoreCursor(nextCursor(res));
         setStatus({ state: "idle", message: "" });
         setLastLoaded(new Date());
       }
@@ -133,6 +139,8 @@ export default function AdminUsersPage() {
           message: error instanceof Error ? error.message : "Failed to load users",
         });
       }
+    } finally {
+      if (cursor && !cancelRef.current) setLoadingMore(false);
     }
   };
 
@@ -513,11 +521,12 @@ export default function AdminUsersPage() {
 
             <div className="chip-row" style={{ gap: "0.35rem", alignItems: "center", flexWrap: "wrap" }}>
               <span className="tiny muted" title={lastLoaded ? formatDateTime(lastLoaded) : undefined}>
-                Showing {filteredUsers.length} of {users.length || 0} accounts
+                Showing {filteredUsers.length} of {users.length || 0}
+                {moreCursor ? " loaded" : ""} accounts
                 {lastLoaded && ` • Updated ${formatRelative(lastLoaded)}`}
               </span>
               <div className="chip-row" style={{ gap: "0.35rem", flexWrap: "wrap", marginLeft: "auto" }}>
-                <button type="button" className="ghost" onClick={loadUsers} disabled={status.state === "loading"}>
+                <button type="button" className="ghost" onClick={() => loadUsers()} disabled={status.state === "loading"}>
                   {status.state === "loading" ? "Refreshing…" : "Refresh"}
                 </button>
               </div>
@@ -770,6 +779,11 @@ export default function AdminUsersPage() {
                   </div>
                 );
               })}
+              {moreCursor && (
+                <button type="button" className="ghost" onClick={() => loadUsers(moreCursor)} disabled={loadingMore}>
+                  {loadingMore ? "Loading…" : "Load more"}
+                </button>
+              )}
             </div>
           </div>
         </div>
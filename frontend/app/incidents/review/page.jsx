@@ -4,7 +4,7 @@ import { useEffect, useMemo, useState } from "react";
 
 import AuthWall from "../../../components/AuthWall";
 import { bearerHeaders, loadTokens } from "../../../lib/auth";
-import { apiUrl } from "../../../lib/api";
+import { apiUrl, nextCursor, withCursor } from "../../../lib/api";
 
 function StatusBadge({ status }) {
   if (!status) return null;
@@ -34,6 +34,8 @@ export default function ReviewIncidentsPage() {
   const [tokens, setTokens] = useState(null);
   const [incidents, setIncidents] = useState([]);
   const [state, setState] = useState({ status: "idle" });
+  const [moreCursor, setMoreCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const listUrl = useMemo(() => apiUrl("/incidents"), []);
 
@@ -57,6 +59,7 @@ export default function ReviewIncidentsPage() {
         const data = await res.json();
         if (!cancelled) {
           setIncidents(data || []);
+          setMoreCursor(nextCursor(res));
           setState({ status: "success" });
         }
       } catch (error) {
@@ -69,6 +72,25 @@ export default function ReviewIncidentsPage() {
     };
   }, [listUrl, tokens]);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const res = await fetch(withCursor(listUrl, moreCursor), { headers: { ...bearerHeaders(tokens) } });
+      if (!res.ok) {
+        const payload = await res.json().catch(() => ({}));
+        setState({ status: "error", message: payload?.detail || `Request failed (${res.status})` });
+        return;
+      }
+      const data = await res.json();
+      setIncidents((prev) => [...prev, ...(data || [])]);
+      setMoreCursor(nextCursor(res));
+    } catch (error) {
+      setState({ status: "error", message: error instanceof Error ? error.message : "Unable to load incidents" });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const needsAuth = !tokens;
 
   return (
@@ -110,6 +132,11 @@ export default function ReviewIncidentsPage() {
               {incidents.map((incident) => (
                 <IncidentCard key={incident.id} incident={incident} />
               ))}
+              {moreCursor && (
+                <button type="button" className="ghost" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? "Loading…" : "Load more"}
+                </button>
+              )}
             </div>
           )}
         </div>
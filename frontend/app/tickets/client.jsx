@@ -3,13 +3,15 @@
 import { useEffect, useMemo, useState } from "react";
 
 import AuthWall from "../../components/AuthWall";
-import { fetchWithAuth, apiUrl } from "../../lib/api";
+import { fetchWithAuth, apiUrl, nextCursor, withCursor } from "../../lib/api";
 import { loadTokens } from "../../lib/auth";
 
 export default function TicketsClient({ session }) {
   const [tokens] = useState(() => session || loadTokens());
   const [tickets, setTickets] = useState([]);
   const [state, setState] = useState({ status: "idle" });
+  const [moreCursor, setMoreCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const listUrl = useMemo(() => apiUrl("/tickets"), []);
 
   useEffect(() => {
@@ -28,6 +30,7 @@ export default function TicketsClient({ session }) {
         const data = await res.json();
         if (!cancelled) {
           setTickets(data || []);
+          setMoreCursor(nextCursor(res));
           setState({ status: "success" });
         }
       } catch (error) {
@@ -41,6 +44,25 @@ export default function TicketsClient({ session }) {
     };
   }, [tokens]);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const res = await fetchWithAuth(withCursor("/tickets", moreCursor), { headers: { Accept: "application/json" } });
+      if (!res.ok) {
+        const payload = await res.json().catch(() => ({}));
+        setState({ status: "error", message: payload?.detail || `Request failed (${res.status})` });
+        return;
+      }
+      const data = await res.json();
+      setTickets((prev) => [...prev, ...(data || [])]);
+      setMoreCursor(nextCursor(res));
+    } catch (error) {
+      setState({ status: "error", message: error instanceof Error ? error.message : "Unable to load tickets" });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <AuthWall session={tokens} title="Tickets are protected" description="Sign in to view company tickets.">
       <section className="grid" style={{ gap: "1.5rem" }}>
@@ -72,6 +94,11 @@ export default function TicketsClient({ session }) {
                   <div className="tiny muted">Owner: {ticket.user_id}</div>
                 </div>
               ))}
+              {moreCursor && (
+                <button type="button" className="ghost" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? "Loading…" : "Load more"}
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -1,9 +1,10 @@
 "use client";
 
-import { clearTokens } from "../lib/auth";
+import { clearTokens, loadTokens, revokeRefreshToken } from "../lib/auth";
 
 export default function LogoutButton({ className = "ghost", onLoggedOut }) {
-  const handleLogout = () => {
+  const handleLogout = async () => {
+    await revokeRefreshToken(loadTokens()?.refresh_token);
     clearTokens();
     if (typeof window !== "undefined") {
       window.location.href = "/login";
@@ -37,3 +37,15 @@ export async function fetchWithAuth(path, init = {}) {
 
   return perform(tokens);
 }
+
+// List endpoints return one page at a time; a response with more rows behind it carries the
+// next page's cursor in X-Next-Cursor.
+export function withCursor(path, cursor) {
+  if (!cursor) return path;
+  const separator = path.includes("?") ? "&" : "?";
+  return `${path}${separator}cursor=${encodeURIComponent(cursor)}`;
+}
+
+export function nextCursor(res) {
+  return res.headers.get("X-Next-Cursor") || null;
+}
@@ -115,6 +115,19 @@ export async function refreshTokens(refreshToken) {
   return data;
 }
 
+export async function revokeRefreshToken(refreshToken) {
+  if (!refreshToken) return;
+  try {
+    await fetch(apiUrl("/auth/logout"), {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+  } catch (error) {
+    console.warn("Unable to revoke refresh token", error);
+  }
+}
+
 export async function ensureFreshTokens(tokens) {
   if (!tokens) return null;
   if (!shouldRefreshSoon(tokens)) return tokens;